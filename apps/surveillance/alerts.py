@@ -12,28 +12,83 @@ creating a tamper-evident chain from detection to delivery.
 
 from __future__ import annotations
 
+import base64
+import inspect
+import json
 import logging
+import os
 import time
-from datetime import datetime, timezone
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 
 import cv2
 import numpy as np
 
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+except ImportError:  # optional: pip install PyTurboJPEG
+    TurboJPEG = None
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+
 from core.comms.mqtt_client import MQTTClient
-from core.data.models import Finding
+from core.data.models import Finding, format_utc
 from core.data.store import DataStore
 from core.security.audit import AuditLogger
 from core.security.crypto import CryptoEngine
-from core.vision.detector import Detection
+from core.vision.detector import COCO_CLASSES, Detection, Detections
 
 logger = logging.getLogger(__name__)
 
+# JPEG quality for evidence frames and detection crops
+JPEG_QUALITY = 85
+
+# Padding (pixels) added around each detection box when saving the crop
+CROP_PAD = 50
+_CROP_PAD_OFFSETS = np.array([-CROP_PAD, -CROP_PAD, CROP_PAD, CROP_PAD], dtype=np.int32)
+
+# Max crop writes in flight before process_detections blocks on the oldest
+MAX_PENDING_WRITES = 16
+
+
+def _load_turbojpeg():
+    """Load libjpeg-turbo bindings if available.
+
+    PyTurboJPEG talks to libjpeg-turbo directly (SIMD colour conversion,
+    DCT and Huffman). Falls back to OpenCV's encoder when the Python
+    package or the shared library is missing.
+    """
+    if TurboJPEG is None:
+        logger.debug("PyTurboJPEG not available, using OpenCV JPEG encoder")
+        return None
+    try:
+        return TurboJPEG()
+    except (OSError, RuntimeError) as e:
+        logger.debug("libjpeg-turbo not loadable (%s), using OpenCV JPEG encoder", e)
+    return None
+
+
+def _dumps(obj: dict) -> bytes:
+    """Serialize an alert to JSON bytes, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj).encode()
+
 
 class AlertManager:
     """Manages detection alerts with deduplication and signing."""
 
+    # Baseline Huffman tables — skip the extra optimization pass per image
+    _CV2_JPEG_PARAMS = [
+        cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY,
+        cv2.IMWRITE_JPEG_OPTIMIZE, 0,
+    ]
+
     def __init__(
         self,
         store: DataStore,
@@ -43,6 +98,7 @@ class AlertManager:
         mission_id: str,
         detections_dir: str = "/var/drone/detections",
         cooldown_s: float = 30.0,
+        num_classes: int = len(COCO_CLASSES),
     ):
         self._store = store
         self._crypto = crypto
@@ -50,14 +106,44 @@ class AlertManager:
         self._mqtt = mqtt_client
         self._mission_id = mission_id
         self._detections_dir = Path(detections_dir)
-        self._cooldown_s = cooldown_s
-        self._last_alert_time: dict[str, float] = {}  # class_name -> timestamp
+        self._detections_dir_str = str(self._detections_dir)
+        self._cooldown_ns = int(cooldown_s * 1e9)
+        # Per-class monotonic deadline (ns) before the next alert is allowed,
+        # indexed by class_id. Class ids outside the table use the dict.
+        self._alert_deadline_ns = [0] * num_classes
+        self._alert_deadline_by_name: dict[str, int] = {}
+        self._tj = _load_turbojpeg()
+        # Reusable output buffer for the per-frame evidence encode
+        # (PyTurboJPEG >= 2.0 can encode into a caller-owned buffer).
+        self._frame_buf: Optional[bytearray] = None
+        self._tj_dst = (
+            self._tj is not None
+            and "dst" in inspect.signature(self._tj.encode).parameters
+        )
+
+        # Crop encode + disk write run off the control loop
+        self._io_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="alert-io")
+        self._pending: deque[Future] = deque()
+
+        # Reused alert payload — only per-finding fields change per alert
+        self._alert_location = {"lat": 0.0, "lon": 0.0, "alt": 0.0}
+        self._alert_payload = {
+            "finding_id": "",
+            "mission_id": mission_id,
+            "timestamp": "",
+            "detection_class": "",
+            "confidence": 0.0,
+            "location": self._alert_location,
+            "image_hash": "",
+            "signed_payload": "",
+            "signature": "",
+        }
 
         self._detections_dir.mkdir(parents=True, exist_ok=True)
 
     def process_detections(
         self,
-        detections: list[Detection],
+        detections: Union[Detections, list[Detection]],
         frame: np.ndarray,
         lat: float,
         lon: float,
@@ -66,86 +152,202 @@ class AlertManager:
         """Process raw detections into signed findings and alerts.
 
         Args:
-            detections: List of detections from the vision layer.
+            detections: Detections from the vision layer (a list of
+                Detection objects is also accepted).
             frame: The original camera frame.
             lat, lon, alt: Current drone GPS position.
 
         Returns:
             List of new findings that passed the cooldown filter.
         """
+        # Cooldown check — avoid alerting on the same thing repeatedly
+        if not isinstance(detections, Detections):
+            detections = Detections.from_list(detections)
+        now_ns = time.monotonic_ns()
+        class_names = detections.class_names
+        keep = [
+            self._cooldown_elapsed(cls_id, name, now_ns)
+            for cls_id, name in zip(detections.class_ids.tolist(), class_names)
+        ]
+        if not any(keep):
+            return []
+        detections = detections[np.array(keep)]
+        class_names = [name for name, k in zip(class_names, keep) if k]
+
+        ts_s, ts_us = divmod(time.time_ns() // 1000, 1_000_000)
+        timestamp_str = format_utc(ts_s, ts_us, "%Y%m%d_%H%M%S_%f")
+
+        # Hash the full frame once for evidence integrity — every
+        # detection in this frame shares the same source image.
+        image_hash = self._hash_frame(frame)
+
+        # Pad and clip all detection boxes to the frame in one pass
+        h, w = frame.shape[:2]
+        boxes = detections.xyxy + _CROP_PAD_OFFSETS
+        np.clip(boxes, 0, (w, h, w, h), out=boxes)
+
+        # Confidences as found on each Finding, and rounded as reported
+        # in audit entries and alerts
+        raw_confidences = detections.confs.tolist()
+        confidences = np.round(detections.confs.astype(np.float64), 3).tolist()
+
         findings = []
-        now = time.time()
-
-        for det in detections:
-            # Cooldown check — avoid alerting on the same thing repeatedly
-            last_time = self._last_alert_time.get(det.class_name, 0)
-            if now - last_time < self._cooldown_s:
-                continue
-            self._last_alert_time[det.class_name] = now
-
-            # Save detection frame
-            timestamp_str = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S_%f")
-            image_filename = f"{det.class_name}_{timestamp_str}.jpg"
-            image_path = self._detections_dir / image_filename
-
-            # Crop and save detection region with some padding
-            h, w = frame.shape[:2]
-            pad = 50
-            crop = frame[
-                max(0, det.y1 - pad):min(h, det.y2 + pad),
-                max(0, det.x1 - pad):min(w, det.x2 + pad),
-            ]
-            cv2.imwrite(str(image_path), crop)
-
-            # Hash the full frame for evidence integrity
-            _, frame_bytes = cv2.imencode(".jpg", frame)
-            image_hash = Finding.hash_image(frame_bytes.tobytes())
-
-            # Create finding
-            finding = Finding(
+        for i, (name, confidence, (x1, y1, x2, y2)) in enumerate(zip(
+            class_names, raw_confidences, boxes.tolist()
+        )):
+            # Save detection frame. The clock is read once per frame, so
+            # the detection index keeps same-class crops apart.
+            image_path = f"{self._detections_dir_str}/{name}_{timestamp_str}_{i}.jpg"
+
+            # Crop and save detection region with some padding. The copy
+            # is contiguous, which the JPEG encoders need.
+            self._submit_write(image_path, frame[y1:y2, x1:x2].copy())
+
+            findings.append(Finding(
                 mission_id=self._mission_id,
                 lat=lat,
                 lon=lon,
                 alt=alt,
-                detection_class=det.class_name,
-                confidence=det.confidence,
-                image_path=str(image_path),
+                detection_class=name,
+                confidence=confidence,
+                image_path=image_path,
                 image_hash=image_hash,
-            )
+            ))
 
-            # Sign the finding
-            signature = self._crypto.sign_data(finding.signable_payload())
-            finding.signature = signature
+        # Sign every finding from this frame with one Ed25519 operation
+        signatures = self._crypto.sign_batch([f.signable_payload() for f in findings])
 
-            # Store locally
-            self._store.save_finding(finding)
+        for finding, signature in zip(findings, signatures):
+            finding.signature = signature
 
-            # Audit log
-            self._audit.log("detection", {
-                "finding_id": finding.id,
-                "class": det.class_name,
-                "confidence": round(det.confidence, 3),
-                "location": [lat, lon, alt],
-            })
+        # Store locally — one transaction for the frame's findings
+        self._store.save_findings_batch(findings)
 
-            # Publish MQTT alert
-            if self._mqtt and self._mqtt.is_connected:
-                alert_payload = {
+        alert_batch = []
+        with self._audit.batch():
+            for finding, confidence in zip(findings, confidences):
+                # Audit log
+                self._audit.log("detection", {
                     "finding_id": finding.id,
-                    "mission_id": self._mission_id,
-                    "timestamp": finding.timestamp,
-                    "detection_class": det.class_name,
-                    "confidence": round(det.confidence, 3),
-                    "location": {"lat": lat, "lon": lon, "alt": alt},
-                    "image_hash": image_hash,
-                    "signature": signature,
-                }
-                self._mqtt.publish_alert(alert_payload)
-
-            findings.append(finding)
-            logger.info(
-                "ALERT: %s (%.1f%%) at %.6f, %.6f",
-                det.class_name, det.confidence * 100, lat, lon,
-            )
+                    "class": finding.detection_class,
+                    "confidence": confidence,
+                    "location": [lat, lon, alt],
+                })
+
+                # Queue MQTT alert — published once per frame below
+                if self._mqtt and self._mqtt.is_connected:
+                    alert_batch.append(self._serialize_alert(finding, confidence))
+
+                logger.info(
+                    "ALERT: %s (%.1f%%) at %.6f, %.6f",
+                    finding.detection_class, finding.confidence * 100, lat, lon,
+                )
+
+        if len(alert_batch) == 1:
+            self._mqtt.publish_alert_raw(alert_batch[0])
+        elif alert_batch:
+            self._mqtt.publish_alert_batch(alert_batch)
 
         return findings
+
+    def _cooldown_elapsed(self, class_id: int, class_name: str, now_ns: int) -> bool:
+        """Check and re-arm the per-class alert cooldown."""
+        deadlines = self._alert_deadline_ns
+        if 0 <= class_id < len(deadlines):
+            if now_ns < deadlines[class_id]:
+                return False
+            deadlines[class_id] = now_ns + self._cooldown_ns
+            return True
+        if now_ns < self._alert_deadline_by_name.get(class_name, 0):
+            return False
+        self._alert_deadline_by_name[class_name] = now_ns + self._cooldown_ns
+        return True
+
+    def flush(self) -> None:
+        """Block until all queued crop writes have completed."""
+        while self._pending:
+            self._pending.popleft().result()
+
+    def close(self) -> None:
+        """Flush pending crop writes and stop the I/O worker. Idempotent."""
+        self.flush()
+        self._io_pool.shutdown(wait=True)
+
+    def _submit_write(self, image_path: str, crop: np.ndarray) -> None:
+        """Queue a crop for encoding and writing on the I/O thread.
+
+        Applies backpressure: if MAX_PENDING_WRITES are already in flight,
+        waits for the oldest one before queueing another.
+        """
+        while self._pending and self._pending[0].done():
+            self._pending.popleft().result()
+        if len(self._pending) >= MAX_PENDING_WRITES:
+            self._pending.popleft().result()
+        self._pending.append(self._io_pool.submit(self._write_crop, image_path, crop))
+
+    def _write_crop(self, image_path: str, crop: np.ndarray) -> None:
+        try:
+            jpeg = memoryview(self._encode_jpeg(crop))
+            fd = os.open(
+                image_path,
+                os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC,
+                0o644,
+            )
+            try:
+                while jpeg:
+                    jpeg = jpeg[os.write(fd, jpeg):]
+            finally:
+                os.close(fd)
+        except Exception as e:
+            logger.error("Failed to save detection crop %s: %s", image_path, e)
+
+    def _serialize_alert(self, finding: Finding, confidence: float) -> bytes:
+        """Fill the reusable alert payload from a finding and serialize it.
+
+        ``confidence`` is the finding's confidence already rounded for display.
+        """
+        payload = self._alert_payload
+        payload["finding_id"] = finding.id
+        payload["timestamp"] = finding.timestamp
+        payload["detection_class"] = finding.detection_class
+        payload["confidence"] = confidence
+        payload["image_hash"] = finding.image_hash
+        # Exact bytes the signature covers, so receivers verify what was signed
+        payload["signed_payload"] = base64.b64encode(finding.signable_payload()).decode()
+        payload["signature"] = finding.signature
+        loc = self._alert_location
+        loc["lat"], loc["lon"], loc["alt"] = finding.lat, finding.lon, finding.alt
+        return _dumps(payload)
+
+    def _hash_frame(self, frame: np.ndarray) -> str:
+        """JPEG-encode the full frame and return its SHA-256.
+
+        Runs on the caller's thread only, so the encode can reuse one
+        preallocated buffer instead of allocating a new one per frame.
+        """
+        if not self._tj_dst:
+            return Finding.hash_image(self._encode_jpeg(frame))
+        frame = np.ascontiguousarray(frame)
+        needed = self._tj.buffer_size(frame)
+        if self._frame_buf is None or len(self._frame_buf) < needed:
+            self._frame_buf = bytearray(needed)
+        _, size = self._tj.encode(
+            frame, quality=JPEG_QUALITY, pixel_format=TJPF_BGR, dst=self._frame_buf
+        )
+        return Finding.hash_image(memoryview(self._frame_buf)[:size])
+
+    def _encode_jpeg(self, image: np.ndarray) -> Union[bytes, np.ndarray]:
+        """JPEG-encode a BGR image, preferring libjpeg-turbo.
+
+        The OpenCV path returns the encoder's flat uint8 array as-is;
+        hashing and os.write take it through the buffer protocol, so it
+        is never copied into a bytes object.
+        """
+        if self._tj is not None:
+            # libjpeg-turbo needs a contiguous buffer (no-op if already so)
+            image = np.ascontiguousarray(image)
+            return self._tj.encode(image, quality=JPEG_QUALITY, pixel_format=TJPF_BGR)
+        ok, buf = cv2.imencode(".jpg", image, self._CV2_JPEG_PARAMS)
+        if not ok:
+            raise RuntimeError("JPEG encode failed")
+        return buf.reshape(-1)
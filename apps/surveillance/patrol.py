@@ -12,11 +12,14 @@ This is the main mission loop that ties together:
 
 from __future__ import annotations
 
-import asyncio
 import logging
+import threading
 import time
+from concurrent.futures import Future
 from typing import Optional
 
+import numpy as np
+
 from core.comms.mqtt_client import MQTTClient
 from core.data.models import Mission, MissionStatus
 from core.data.store import DataStore
@@ -76,7 +79,18 @@ class PatrolMission:
         self._current_wp_index = 0
         self._running = False
         self._paused = False
+        self._resume_event = threading.Event()
+        self._aborted = False
+        # Set while _run_patrol_loop owns the camera/detector/alert workers
+        self._loop_active = False
+        self._teardown_lock = threading.Lock()
+        self._torn_down = False
         self._total_findings = 0
+        self._last_frame_id = 0
+        # Frame currently in inference: (future, frame, (lat, lon, alt))
+        self._pending_detection: Optional[
+            tuple[Future, np.ndarray, tuple[float, float, float]]
+        ] = None
 
     @property
     def is_running(self) -> bool:
@@ -192,88 +206,128 @@ class PatrolMission:
         altitude = self._mission.parameters.get("altitude_m", 30.0)
         rtl_battery = self._config.get("rtl_battery_pct", 25)
 
-        while self._running:
-            for i, wp in enumerate(waypoints):
-                if not self._running:
-                    break
-
-                self._current_wp_index = i
-                lat, lon = wp["lat"], wp["lon"]
-                wp_alt = wp.get("alt", altitude)
-
-                logger.info("Navigating to waypoint %d: %.6f, %.6f", i, lat, lon)
-                self._audit.log("waypoint_navigate", {
-                    "waypoint_index": i,
-                    "target": [lat, lon, wp_alt],
-                })
-
-                self._flight.goto(lat, lon, wp_alt)
-
-                # Fly to waypoint while running detection
-                while self._running and not self._flight.reached_waypoint(lat, lon):
-                    self._flight.update_telemetry()
-                    self._process_frame()
-                    self._check_battery(rtl_battery)
-
-                    if self._paused:
-                        self._handle_pause()
-
-                    time.sleep(0.1)
-
-                if not self._running:
+        # Bound once for the whole mission — these never change mid-flight
+        process_frame = self._process_frame
+        wait_for_frame = self._wait_for_frame
+        check_battery = self._check_battery
+        clock = time.monotonic
+
+        self._loop_active = True
+        try:
+            while self._running:
+                for i, wp in enumerate(waypoints):
+                    if not self._running:
+                        break
+
+                    self._current_wp_index = i
+                    lat, lon = wp["lat"], wp["lon"]
+                    wp_alt = wp.get("alt", altitude)
+
+                    logger.info("Navigating to waypoint %d: %.6f, %.6f", i, lat, lon)
+                    self._audit.log("waypoint_navigate", {
+                        "waypoint_index": i,
+                        "target": [lat, lon, wp_alt],
+                    })
+
+                    self._flight.goto(lat, lon, wp_alt)
+
+                    # Fly to waypoint while running detection
+                    while self._running and not self._flight.reached_waypoint(lat, lon):
+                        process_frame()
+                        check_battery(rtl_battery)
+
+                        if self._paused:
+                            self._handle_pause()
+
+                        wait_for_frame(0.1)
+
+                    if not self._running:
+                        break
+
+                    # Hover at waypoint
+                    logger.debug("Reached waypoint %d, hovering %.1fs", i, hover_time)
+                    hover_end = clock() + hover_time
+                    while self._running and clock() < hover_end:
+                        detections_found = process_frame()
+
+                        # If we detect something, loiter longer
+                        if detections_found:
+                            logger.info("Detection at waypoint %d, loitering %.1fs", i, loiter_time)
+                            loiter_end = clock() + loiter_time
+                            while self._running and clock() < loiter_end:
+                                process_frame()
+                                wait_for_frame(0.1)
+
+                        wait_for_frame(0.1)
+
+                # Completed one loop
+                if not loop_patrol:
+                    logger.info("Patrol complete (single pass)")
+                    self._running = False
                     break
-
-                # Hover at waypoint
-                logger.debug("Reached waypoint %d, hovering %.1fs", i, hover_time)
-                hover_end = time.time() + hover_time
-                while self._running and time.time() < hover_end:
-                    self._flight.update_telemetry()
-                    detections_found = self._process_frame()
-
-                    # If we detect something, loiter longer
-                    if detections_found:
-                        logger.info("Detection at waypoint %d, loitering %.1fs", i, loiter_time)
-                        loiter_end = time.time() + loiter_time
-                        while self._running and time.time() < loiter_end:
-                            self._flight.update_telemetry()
-                            self._process_frame()
-                            time.sleep(0.1)
-
-                    time.sleep(0.1)
-
-            # Completed one loop
-            if not loop_patrol:
-                logger.info("Patrol complete (single pass)")
-                self._running = False
-                break
-            else:
-                logger.info("Patrol loop complete, restarting...")
-                self._audit.log("patrol_loop_complete", {
-                    "findings_total": self._total_findings,
-                })
-
-        self.complete()
+                else:
+                    logger.info("Patrol loop complete, restarting...")
+                    self._audit.log("patrol_loop_complete", {
+                        "findings_total": self._total_findings,
+                    })
+
+            if not self._aborted:
+                self.complete()
+        finally:
+            # Teardown happens here, on the loop thread, so abort() from
+            # another thread never shuts down a pool the loop is still using
+            self._loop_active = False
+            self._teardown()
 
     def _process_frame(self) -> bool:
         """Capture frame, run detection, process alerts.
 
+        Detection is pipelined one frame deep: the new frame is handed to
+        the detector's inference thread, then the previous frame's
+        results are turned into alerts while inference runs.
+
         Returns True if any detections triggered alerts.
         """
         ok, frame, frame_id = self._camera.read()
-        if not ok or frame is None:
+        if not ok or frame is None or frame_id == self._last_frame_id:
             return False
+        self._last_frame_id = frame_id
 
-        detections = self._detector.detect(frame)
+        previous = self._pending_detection
+        self._pending_detection = (
+            self._detector.detect_async(frame), frame, self._flight.location
+        )
+        if previous is None:
+            return False
+        return self._handle_detections(*previous)
+
+    def _flush_detections(self) -> None:
+        """Process the frame still in inference, if any."""
+        pending, self._pending_detection = self._pending_detection, None
+        if pending is not None:
+            self._handle_detections(*pending)
+
+    def _handle_detections(
+        self,
+        future: Future,
+        frame: np.ndarray,
+        location: tuple[float, float, float],
+    ) -> bool:
+        detections = future.result()
         if not detections:
             return False
 
-        lat, lon, alt = self._flight.location
+        lat, lon, alt = location
         findings = self._alert_mgr.process_detections(
             detections, frame, lat, lon, alt
         )
         self._total_findings += len(findings)
         return len(findings) > 0
 
+    def _wait_for_frame(self, timeout: float) -> None:
+        """Wait for the next camera frame, or at most timeout seconds."""
+        self._camera.wait_for_frame(self._last_frame_id, timeout)
+
     def _check_battery(self, rtl_threshold: int) -> None:
         """Trigger RTL if battery is critically low."""
         telem = self._flight.telemetry
@@ -294,48 +348,69 @@ class PatrolMission:
         self._flight.set_mode("LOITER")
         self._audit.log("mission_paused", {})
         while self._paused and self._running:
-            self._flight.update_telemetry()
-            time.sleep(0.5)
+            self._resume_event.wait(0.5)
         if self._running:
             self._flight.set_mode("GUIDED")
             self._audit.log("mission_resumed", {})
 
     def _wait_for_altitude(self, target_alt: float, timeout: float = 30) -> bool:
         """Wait until drone reaches target altitude."""
-        start = time.time()
-        while time.time() - start < timeout:
-            self._flight.update_telemetry()
+        deadline = time.time() + timeout
+        while True:
             telem = self._flight.telemetry
             if telem.alt_rel >= target_alt:
                 return True
-            time.sleep(0.5)
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            self._flight.wait_for_update(min(remaining, 0.5))
         logger.warning("Altitude timeout: wanted %.1fm, at %.1fm", target_alt, telem.alt_rel)
         return False
 
+    def _set_status(self, status: MissionStatus) -> None:
+        # start() wrote the full mission row; after that only the
+        # status column changes
+        self._mission.status = status
+        self._store.update_mission_status(self._mission.id, status)
+
     def pause(self) -> None:
         """Pause the patrol (loiter in place)."""
         self._paused = True
-        self._mission.status = MissionStatus.PAUSED
-        self._store.save_mission(self._mission)
+        self._resume_event.clear()
+        self._set_status(MissionStatus.PAUSED)
 
     def resume(self) -> None:
         """Resume a paused patrol."""
         self._paused = False
-        self._mission.status = MissionStatus.ACTIVE
-        self._store.save_mission(self._mission)
+        self._resume_event.set()
+        self._set_status(MissionStatus.ACTIVE)
 
     def abort(self) -> None:
         """Abort the mission and return to launch."""
         logger.warning("Mission ABORTED")
+        self._aborted = True
         self._running = False
+        self._resume_event.set()
         self._audit.log("mission_abort", {
             "findings_total": self._total_findings,
             "last_waypoint": self._current_wp_index,
         })
-        self._mission.status = MissionStatus.ABORTED
-        self._store.save_mission(self._mission)
+        self._set_status(MissionStatus.ABORTED)
         self._flight.rtl()
+        # A running loop tears down when it exits; otherwise do it here
+        if not self._loop_active:
+            self._teardown()
+
+    def _teardown(self) -> None:
+        """Stop the camera and shut down detector/alert workers, once."""
+        with self._teardown_lock:
+            if self._torn_down:
+                return
+            self._torn_down = True
         self._camera.stop()
+        self._pending_detection = None
+        self._detector.close()
+        self._alert_mgr.close()
 
     def complete(self) -> None:
         """Complete the mission — land and finalize."""
@@ -343,14 +418,14 @@ class PatrolMission:
             "Mission complete. Total findings: %d", self._total_findings
         )
         self._running = False
+        self._flush_detections()
         self._audit.log("mission_complete", {
             "mission_id": self._mission.id,
             "findings_total": self._total_findings,
         })
-        self._mission.status = MissionStatus.COMPLETED
-        self._store.save_mission(self._mission)
+        self._set_status(MissionStatus.COMPLETED)
         self._flight.land()
-        self._camera.stop()
+        self._teardown()
 
         # Publish completion status
         if self._mqtt and self._mqtt.is_connected:
@@ -13,9 +13,11 @@ from __future__ import annotations
 
 import json
 import logging
+import os
+import pickle
 import sys
-import time
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
 import click
@@ -31,13 +33,15 @@ from core.data.store import DataStore
 from core.security.identity import DroneIdentity
 from core.security.crypto import CryptoEngine
 from core.security.audit import AuditLogger
-from core.flight.controller import FlightController
-from core.vision.camera import Camera
-from core.vision.detector import Detector
-from core.comms.mqtt_client import MQTTClient
-from apps.surveillance.patrol import PatrolMission
 
-console = Console()
+# Flight, vision, comms and the patrol app pull in pymavlink, OpenCV,
+# the detector backends and paho-mqtt. They are imported inside the
+# commands that fly or probe hardware so that audit/missions stay fast.
+
+logger = logging.getLogger(__name__)
+
+# Skip rich's per-print syntax highlighter when output is piped
+console = Console(highlight=sys.stdout.isatty())
 
 BANNER = """[bold cyan]
   ____                        ____  _       _    __
@@ -49,31 +53,144 @@ BANNER = """[bold cyan]
 [dim]Security-First Autonomous Drone Software for NVIDIA Jetson[/dim]
 [dim]v0.1.0 | Zypher Synergy[/dim]"""
 
+# Shared by every command that needs a provisioned identity. Building a
+# Panel does not parse its markup, so this costs nothing at import.
+NOT_PROVISIONED_PANEL = Panel(
+    "[red]Drone not provisioned.[/red]\n\n"
+    "Run [bold]drone-cli provision[/bold] first.",
+    title="[red]Error[/red]",
+    border_style="red",
+)
+
+# LibYAML's C parser when PyYAML was built with it
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+# Above this many rows, audit/missions print plain tab-separated lines
+# instead of laying out a rich table.
+PLAIN_TABLE_ROWS = 200
+
+AUDIT_ACTION_STYLES = {
+    "start": "green", "complete": "bold green", "boot": "blue",
+    "abort": "red", "error": "red", "detection": "yellow",
+    "navigate": "cyan", "battery": "bold red",
+}
+
+@lru_cache(maxsize=None)
+def _action_style(action: str) -> str:
+    """Style for an audit action: the first AUDIT_ACTION_STYLES keyword it contains.
+
+    Audit logs repeat a handful of action names, so each distinct name is
+    scanned once and later rows are a cache hit.
+    """
+    for keyword, color in AUDIT_ACTION_STYLES.items():
+        if keyword in action:
+            return color
+    return "white"
+
+
+# (above this percentage, style) — checked in order, red below the last
+BATTERY_STYLES = ((50, "bold green"), (25, "bold yellow"))
+
+
+def _battery_style(pct: int) -> str:
+    for threshold, style in BATTERY_STYLES:
+        if pct > threshold:
+            return style
+    return "bold red"
+
+
+MISSION_STATUS_STYLES = {
+    "draft": "dim",
+    "active": "bold cyan",
+    "paused": "yellow",
+    "completed": "bold green",
+    "aborted": "bold red",
+}
+
 
 def expand_paths(obj):
-    """Recursively expand ~ in all string values that look like paths."""
-    if isinstance(obj, dict):
-        return {k: expand_paths(v) for k, v in obj.items()}
-    if isinstance(obj, list):
-        return [expand_paths(v) for v in obj]
+    """Expand ~ in all string values that look like paths.
+
+    Walks nested dicts and lists in place with an explicit stack, so
+    only the strings that need expanding are replaced.
+    """
     if isinstance(obj, str) and obj.startswith("~"):
-        return str(Path(obj).expanduser())
+        return os.path.expanduser(obj)
+    if not isinstance(obj, (dict, list)):
+        return obj
+    stack = [obj]
+    while stack:
+        cur = stack.pop()
+        items = cur.items() if isinstance(cur, dict) else enumerate(cur)
+        for k, v in items:
+            if isinstance(v, str):
+                if v.startswith("~"):
+                    cur[k] = os.path.expanduser(v)
+            elif isinstance(v, (dict, list)):
+                stack.append(v)
     return obj
 
 
+def _load_yaml_cached(path: str):
+    """Parse a YAML file, memoized in a ``<path>.pkl`` sidecar.
+
+    The sidecar records the source file's mtime and size and is only
+    used while both still match. Because unpickling runs code, a sidecar
+    is ignored unless it is owned by the current user and not writable
+    by group or others.
+    """
+    cache_path = path + ".pkl"
+    src = os.stat(path)
+    key = (src.st_mtime_ns, src.st_size)
+    try:
+        cst = os.stat(cache_path)
+        if cst.st_uid == os.getuid() and not cst.st_mode & 0o022:
+            with open(cache_path, "rb") as f:
+                cached_key, cfg = pickle.load(f)
+            if cached_key == key:
+                return cfg
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+        pass
+
+    if _YamlLoader is yaml.SafeLoader:
+        logger.warning(
+            "PyYAML was built without LibYAML; config parsing uses the slow "
+            "pure-Python loader (install libyaml-dev and reinstall pyyaml)"
+        )
+    # Binary read: the loader detects the encoding itself
+    with open(path, "rb") as f:
+        cfg = yaml.load(f, Loader=_YamlLoader)
+
+    # Best effort — config dirs like /etc/drone are often read-only
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump((key, cfg), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+    return cfg
+
+
+# Searched in order after an explicit --config path
+DEFAULT_CONFIG_PATHS = (
+    os.path.expanduser("~/.drone/config.yaml"),
+    "/etc/drone/config.yaml",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", "default.yaml"),
+)
+
+
 def load_config(config_path: str = None) -> dict:
     """Load configuration from YAML file."""
-    paths = [
-        config_path,
-        str(Path("~/.drone/config.yaml").expanduser()),
-        "/etc/drone/config.yaml",
-        str(Path(__file__).parent / "config" / "default.yaml"),
-    ]
-    for p in paths:
-        if p and Path(p).exists():
-            with open(p) as f:
-                cfg = yaml.safe_load(f)
-                return expand_paths(cfg) if cfg else {}
+    for p in (config_path, *DEFAULT_CONFIG_PATHS):
+        if p and os.path.isfile(p):
+            cfg = _load_yaml_cached(p)
+            return expand_paths(cfg) if cfg else {}
     return {}
 
 
@@ -86,6 +203,14 @@ def setup_logging(verbose: bool = False) -> None:
     )
 
 
+def banner(ctx) -> None:
+    """Print the banner, unless output is piped or --quiet was given."""
+    if ctx.obj["quiet"] or not console.is_terminal:
+        return
+    console.print(BANNER)
+    console.print()
+
+
 def step(msg: str, status: str = "info") -> None:
     """Print a styled step message."""
     icons = {
@@ -102,13 +227,15 @@ def step(msg: str, status: str = "info") -> None:
 @click.group()
 @click.option("-c", "--config", "config_path", default=None, help="Config file path")
 @click.option("-v", "--verbose", is_flag=True, help="Enable debug logging")
+@click.option("-q", "--quiet", is_flag=True, help="Don't print the banner")
 @click.pass_context
-def main(ctx, config_path, verbose):
+def main(ctx, config_path, verbose, quiet):
     """Drone Platform \u2014 Security-first drone software for Jetson."""
     setup_logging(verbose)
     ctx.ensure_object(dict)
     ctx.obj["config"] = load_config(config_path)
     ctx.obj["verbose"] = verbose
+    ctx.obj["quiet"] = quiet
 
 
 # ── PROVISION ─────────────────────────────────────────────────────────────
@@ -119,8 +246,7 @@ def main(ctx, config_path, verbose):
 @click.pass_context
 def provision(ctx, org_id, identity_dir):
     """Provision a new drone identity (run once per device)."""
-    console.print(BANNER)
-    console.print()
+    banner(ctx)
 
     identity_dir = str(Path(identity_dir).expanduser())
     identity = DroneIdentity(identity_dir=identity_dir)
@@ -175,8 +301,9 @@ def provision(ctx, org_id, identity_dir):
 @click.pass_context
 def status(ctx):
     """Show current drone status and telemetry."""
-    console.print(BANNER)
-    console.print()
+    from core.flight.controller import FlightController
+
+    banner(ctx)
 
     config = ctx.obj["config"]
     fc_config = config.get("flight", {})
@@ -185,12 +312,7 @@ def status(ctx):
         identity_dir=config.get("drone", {}).get("identity_dir", "/etc/drone/identity")
     )
     if not identity.is_provisioned:
-        console.print(Panel(
-            "[red]Drone not provisioned.[/red]\n\n"
-            "Run [bold]drone-cli provision[/bold] first.",
-            title="[red]Error[/red]",
-            border_style="red",
-        ))
+        console.print(NOT_PROVISIONED_PANEL)
         return
 
     step(f"Drone ID: [bold]{identity.drone_id}[/bold]", "info")
@@ -209,10 +331,8 @@ def status(ctx):
 
     step("Connected", "ok")
 
-    # Poll telemetry a few times for accurate data
-    for _ in range(10):
-        fc.update_telemetry()
-        time.sleep(0.1)
+    # Give the telemetry thread a moment to see mode, GPS and battery
+    fc.wait_for_telemetry(timeout=1.0)
     t = fc.telemetry
 
     console.print()
@@ -231,43 +351,40 @@ def status(ctx):
     tbl.add_column("Parameter", style="dim", width=16)
     tbl.add_column("Value", width=30)
 
-    conn_style = "bold green" if t.connected else "bold red"
-    armed_style = "bold red" if t.armed else "bold green"
-
+    # Styled cells are Text objects, so rich skips markup parsing
     tbl.add_row(
-        "Connection", f"[{conn_style}]{'Connected' if t.connected else 'Disconnected'}[/{conn_style}]",
-        "Armed", f"[{armed_style}]{t.armed}[/{armed_style}]",
+        "Connection",
+        Text("Connected", style="bold green") if t.connected
+        else Text("Disconnected", style="bold red"),
+        "Armed", Text(str(t.armed), style="bold red" if t.armed else "bold green"),
     )
     tbl.add_row(
-        "Flight Mode", f"[bold]{t.mode or 'Unknown'}[/bold]",
-        "GPS Fix", f"{t.gps_fix}D ({t.gps_satellites} sats)",
+        "Flight Mode", Text(t.mode or "Unknown", style="bold"),
+        "GPS Fix", Text(f"{t.gps_fix}D ({t.gps_satellites} sats)"),
     )
     tbl.add_row(
-        "Latitude", f"{t.lat:.7f}",
-        "Longitude", f"{t.lon:.7f}",
+        "Latitude", Text(f"{t.lat:.7f}"),
+        "Longitude", Text(f"{t.lon:.7f}"),
     )
     tbl.add_row(
-        "Altitude (rel)", f"{t.alt_rel:.1f} m",
-        "Altitude (MSL)", f"{t.alt_msl:.1f} m",
+        "Altitude (rel)", Text(f"{t.alt_rel:.1f} m"),
+        "Altitude (MSL)", Text(f"{t.alt_msl:.1f} m"),
     )
     tbl.add_row(
-        "Groundspeed", f"{t.groundspeed:.1f} m/s",
-        "Heading", f"{t.yaw:.0f}\u00b0",
+        "Groundspeed", Text(f"{t.groundspeed:.1f} m/s"),
+        "Heading", Text(f"{t.yaw:.0f}\u00b0"),
     )
 
     if t.battery_pct >= 0:
-        if t.battery_pct > 50:
-            bat_style = "bold green"
-        elif t.battery_pct > 25:
-            bat_style = "bold yellow"
-        else:
-            bat_style = "bold red"
-        bat_str = f"[{bat_style}]{t.battery_pct}%[/{bat_style}] ({t.battery_voltage:.1f}V)"
+        bat_cell = Text.assemble(
+            (f"{t.battery_pct}%", _battery_style(t.battery_pct)),
+            f" ({t.battery_voltage:.1f}V)",
+        )
     else:
-        bat_str = "[dim]Unknown[/dim]"
+        bat_cell = Text("Unknown", style="dim")
     tbl.add_row(
-        "Battery", bat_str,
-        "Last Heartbeat", t.last_heartbeat or "[dim]None[/dim]",
+        "Battery", bat_cell,
+        "Last Heartbeat", Text(t.last_heartbeat) if t.last_heartbeat else Text("None", style="dim"),
     )
 
     console.print(tbl)
@@ -285,8 +402,13 @@ def status(ctx):
 @click.pass_context
 def patrol(ctx, waypoints, altitude, speed, loop):
     """Start a surveillance patrol mission."""
-    console.print(BANNER)
-    console.print()
+    from apps.surveillance.patrol import PatrolMission
+    from core.comms.mqtt_client import MQTTClient
+    from core.flight.controller import FlightController
+    from core.vision.camera import Camera
+    from core.vision.detector import Detector
+
+    banner(ctx)
 
     config = ctx.obj["config"]
     drone_cfg = config.get("drone", {})
@@ -300,12 +422,7 @@ def patrol(ctx, waypoints, altitude, speed, loop):
         identity_dir=drone_cfg.get("identity_dir", "/etc/drone/identity")
     )
     if not identity.is_provisioned:
-        console.print(Panel(
-            "[red]Drone not provisioned.[/red]\n\n"
-            "Run [bold]drone-cli provision[/bold] first.",
-            title="[red]Error[/red]",
-            border_style="red",
-        ))
+        console.print(NOT_PROVISIONED_PANEL)
         return
 
     # Load waypoints
@@ -337,7 +454,11 @@ def patrol(ctx, waypoints, altitude, speed, loop):
 
     # Initialize systems
     step("Initializing security layer...", "wait")
-    store = DataStore(db_path=config.get("data", {}).get("db_path", "/var/drone/missions.db"))
+    data_cfg = config.get("data", {})
+    store = DataStore(
+        db_path=data_cfg.get("db_path", "/var/drone/missions.db"),
+        synchronous=data_cfg.get("synchronous", "NORMAL"),
+    )
     crypto = CryptoEngine(identity)
     audit = AuditLogger(store, crypto, identity.drone_id)
     step("Security layer initialized", "ok")
@@ -358,6 +479,7 @@ def patrol(ctx, waypoints, altitude, speed, loop):
         model_name=vision_cfg.get("model", "yolov8n"),
         confidence_threshold=vision_cfg.get("confidence_threshold", 0.5),
         target_classes=vision_cfg.get("target_classes", ["person", "car"]),
+        engine_cache_dir=vision_cfg.get("engine_cache_dir"),
     )
 
     mqtt_client = None
@@ -369,6 +491,8 @@ def patrol(ctx, waypoints, altitude, speed, loop):
             topic_prefix=comms_cfg.get("topic_prefix", "drone"),
             use_tls=comms_cfg.get("use_tls", False),
             qos=comms_cfg.get("qos", 1),
+            protocol=comms_cfg.get("protocol", 4),
+            batch_alerts=comms_cfg.get("batch_alerts", False),
         )
 
     # Connect flight controller
@@ -382,6 +506,7 @@ def patrol(ctx, waypoints, altitude, speed, loop):
     # Load detection model
     step("Loading detection model...", "wait")
     if detector.load():
+        detector.warmup()
         step(f"Model loaded (backend: {detector.backend})", "ok")
     else:
         step("Detection model not available \u2014 running flight only", "warn")
@@ -454,14 +579,27 @@ def patrol(ctx, waypoints, altitude, speed, loop):
 # ── AUDIT ─────────────────────────────────────────────────────────────────
 
 @main.command()
-@click.option("--limit", "-n", default=20, help="Number of entries to show")
+@click.option("--limit", "-n", default=20, help="Number of entries to show (0 for all)")
 @click.pass_context
 def audit(ctx, limit):
     """Show recent audit log entries."""
     config = ctx.obj["config"]
     store = DataStore(db_path=config.get("data", {}).get("db_path", "/var/drone/missions.db"))
-    entries = store.get_audit_log(limit=limit)
-    store.close()
+    try:
+        entries = store.iter_audit_log(limit=limit or None)
+        if not limit or limit > PLAIN_TABLE_ROWS:
+            # Plain output streams each row as it is read
+            shown = 0
+            for entry in entries:
+                details_str = ", ".join(f"{k}={v}" for k, v in entry.details.items())
+                click.echo(f"{entry.timestamp}\t{entry.actor}\t{entry.action}\t{details_str}")
+                shown += 1
+            if not shown:
+                step("No audit entries found.", "info")
+            return
+        entries = list(entries)
+    finally:
+        store.close()
 
     if not entries:
         step("No audit entries found.", "info")
@@ -474,32 +612,23 @@ def audit(ctx, limit):
         header_style="bold cyan",
         title_style="bold white",
     )
-    tbl.add_column("Timestamp", style="dim", width=22)
-    tbl.add_column("Actor", width=14)
+    tbl.add_column("Timestamp", style="dim", width=22, no_wrap=True)
+    tbl.add_column("Actor", width=14, no_wrap=True)
     tbl.add_column("Action", style="bold", width=22)
     tbl.add_column("Details", width=46)
 
-    for entry in reversed(entries):
+    # Cells are Text objects rather than markup strings, so rich does
+    # not run its markup parser on every cell.
+    for entry in entries:
         details_str = ""
         if entry.details:
             details_str = ", ".join(f"{k}={v}" for k, v in entry.details.items())
 
-        action_colors = {
-            "start": "green", "complete": "bold green", "boot": "blue",
-            "abort": "red", "error": "red", "detection": "yellow",
-            "navigate": "cyan", "battery": "bold red",
-        }
-        action_style = "white"
-        for keyword, color in action_colors.items():
-            if keyword in entry.action:
-                action_style = color
-                break
-
         tbl.add_row(
-            entry.timestamp[:22],
-            entry.actor[:14],
-            f"[{action_style}]{entry.action}[/{action_style}]",
-            details_str[:46] + ("\u2026" if len(details_str) > 46 else ""),
+            Text(entry.timestamp[:22]),
+            Text(entry.actor[:14]),
+            Text(entry.action, style=_action_style(entry.action)),
+            Text(details_str[:46] + ("\u2026" if len(details_str) > 46 else "")),
         )
 
     console.print()
@@ -510,16 +639,45 @@ def audit(ctx, limit):
 # ── VERIFY AUDIT ──────────────────────────────────────────────────────────
 
 @main.command("verify-audit")
+@click.option("--incremental", is_flag=True,
+              help="Only check entries added since the last incremental verification")
+@click.option("--signatures", is_flag=True,
+              help="Also verify every entry's Ed25519 signature")
 @click.pass_context
-def verify_audit(ctx):
+def verify_audit(ctx, incremental, signatures):
     """Verify the audit log hash chain integrity."""
     config = ctx.obj["config"]
+    identity = None
+    if signatures:
+        identity = DroneIdentity(
+            identity_dir=config.get("drone", {}).get("identity_dir", "/etc/drone/identity")
+        )
+        if not identity.is_provisioned:
+            console.print(NOT_PROVISIONED_PANEL)
+            return
+
     store = DataStore(db_path=config.get("data", {}).get("db_path", "/var/drone/missions.db"))
-    is_valid, count = store.verify_audit_chain()
-    store.close()
+    try:
+        is_valid, count = store.verify_audit_chain(batch_size=4096, incremental=incremental)
+        sig_valid, sig_count = True, count
+        if is_valid and identity is not None:
+            audit = AuditLogger(store, CryptoEngine(identity), identity.drone_id)
+            sig_valid, sig_count = audit.verify_signatures(workers=os.cpu_count() or 1)
+    finally:
+        store.close()
 
     console.print()
-    if count == 0:
+    if not sig_valid:
+        console.print(Panel(
+            f"[bold red]SIGNATURE INVALID[/bold red]\n\n"
+            f"  Bad signature at entry:  [bold]{sig_count}[/bold]\n\n"
+            f"[bold]The entry was not signed by this drone's key.[/bold]\n"
+            f"[dim]The hash chain links up, but the entry may have been forged.[/dim]",
+            title="[bold red]Audit Verification FAILED[/bold red]",
+            border_style="red",
+            padding=(1, 2),
+        ))
+    elif count == 0:
         step("No audit entries to verify.", "info")
     elif is_valid:
         console.print(Panel(
@@ -559,6 +717,15 @@ def missions(ctx):
         store.close()
         return
 
+    if len(all_missions) > PLAIN_TABLE_ROWS:
+        for m in all_missions:
+            click.echo(
+                f"{m.id}\t{m.status.value}\t{m.type}\t{len(m.waypoints)}\t"
+                f"{store.get_finding_count(m.id)}\t{m.created_at}"
+            )
+        store.close()
+        return
+
     tbl = Table(
         title=f"Missions ({len(all_missions)})",
         box=box.ROUNDED,
@@ -566,33 +733,26 @@ def missions(ctx):
         header_style="bold cyan",
         title_style="bold white",
     )
-    tbl.add_column("ID", width=14)
-    tbl.add_column("Status", width=12)
+    tbl.add_column("ID", width=14, no_wrap=True)
+    tbl.add_column("Status", width=12, no_wrap=True)
     tbl.add_column("Type", width=14)
-    tbl.add_column("Waypoints", justify="center", width=10)
-    tbl.add_column("Findings", justify="center", width=10)
-    tbl.add_column("Created", width=22)
+    tbl.add_column("Waypoints", justify="center", width=10, no_wrap=True)
+    tbl.add_column("Findings", justify="center", width=10, no_wrap=True)
+    tbl.add_column("Created", width=22, no_wrap=True)
 
     for m in all_missions:
         findings = store.get_finding_count(m.id)
 
-        status_colors = {
-            "draft": "dim",
-            "active": "bold cyan",
-            "paused": "yellow",
-            "completed": "bold green",
-            "aborted": "bold red",
-        }
-        style = status_colors.get(m.status.value, "white")
+        style = MISSION_STATUS_STYLES.get(m.status.value, "white")
         findings_style = "bold yellow" if findings > 0 else "dim"
 
         tbl.add_row(
-            m.id[:13] + "\u2026",
-            f"[{style}]{m.status.value.upper()}[/{style}]",
-            m.type,
-            str(len(m.waypoints)),
-            f"[{findings_style}]{findings}[/{findings_style}]",
-            m.created_at[:22],
+            Text(m.id[:13] + "\u2026"),
+            Text(m.status.value.upper(), style=style),
+            Text(m.type),
+            Text(str(len(m.waypoints))),
+            Text(str(findings), style=findings_style),
+            Text(m.created_at[:22]),
         )
 
     store.close()
@@ -607,8 +767,11 @@ def missions(ctx):
 @click.pass_context
 def preflight(ctx):
     """Run preflight system checks."""
-    console.print(BANNER)
-    console.print()
+    from core.flight.controller import FlightController
+    from core.vision.camera import Camera
+    from core.vision.detector import Detector
+
+    banner(ctx)
 
     config = ctx.obj["config"]
     drone_cfg = config.get("drone", {})
@@ -629,9 +792,7 @@ def preflight(ctx):
     conn_str = flight_cfg.get("connection", "udp:127.0.0.1:14550")
     fc = FlightController(connection_string=conn_str, heartbeat_timeout=3)
     if fc.connect():
-        for _ in range(10):
-            fc.update_telemetry()
-            time.sleep(0.1)
+        fc.wait_for_telemetry(timeout=1.0)
         t = fc.telemetry
         checks.append(("Flight Controller", True, f"Connected ({t.mode})"))
         checks.append(("GPS", t.gps_fix >= 3, f"{t.gps_fix}D fix, {t.gps_satellites} sats"))
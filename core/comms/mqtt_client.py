@@ -10,14 +10,53 @@ from __future__ import annotations
 
 import json
 import logging
+import socket
 import threading
-import time
-from typing import Callable, Optional
+from typing import Callable, Optional, Union
 
 import paho.mqtt.client as mqtt
+from paho.mqtt.packettypes import PacketTypes
+from paho.mqtt.properties import Properties
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# Alert batches are split so no single PUBLISH exceeds this payload size
+MAX_BATCH_BYTES = 64 * 1024
+
+# QoS 1/2 messages awaiting acknowledgement before paho starts queueing
+MAX_INFLIGHT = 100
+
+
+def _dumps(obj: dict) -> bytes:
+    """Serialize a message to JSON bytes, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj).encode()
+
+
+def _loads(data: bytes):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _varint(n: int) -> bytes:
+    """Encode a non-negative int as an MQTT-style variable byte integer."""
+    out = bytearray()
+    while True:
+        byte = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
 
 class MQTTClient:
     """Secure MQTT client for drone-to-ground communication."""
@@ -30,21 +69,41 @@ class MQTTClient:
         topic_prefix: str = "drone",
         use_tls: bool = False,
         qos: int = 1,
+        protocol: int = mqtt.MQTTv311,
+        batch_alerts: bool = False,
     ):
         self._broker = broker
         self._port = port
         self._drone_id = drone_id
         self._prefix = topic_prefix
         self._qos = qos
+        self._protocol = protocol
+        self._batch_alerts = batch_alerts
+        self._alert_topic = f"{topic_prefix}/alerts/{drone_id}"
+        self._alert_batch_topic = f"{self._alert_topic}/batch"
+        self._telemetry_topic = f"{topic_prefix}/telemetry/{drone_id}"
+        self._status_topic = f"{topic_prefix}/status/{drone_id}"
+        self._command_topic = f"{topic_prefix}/commands/{drone_id}"
         self._connected = False
+        # Set when the broker answers our CONNECT, accepted or refused
+        self._connack = threading.Event()
         self._command_callback: Optional[Callable[[dict], None]] = None
 
         # MQTT client setup
         client_id = f"drone-{drone_id[:8]}" if drone_id else "drone-unknown"
-        self._client = mqtt.Client(client_id=client_id)
+        if hasattr(mqtt, "CallbackAPIVersion"):
+            # paho-mqtt >= 2.0: same callback signatures for MQTT 3.1.1 and 5
+            self._client = mqtt.Client(
+                mqtt.CallbackAPIVersion.VERSION2,
+                client_id=client_id,
+                protocol=protocol,
+            )
+        else:
+            self._client = mqtt.Client(client_id=client_id, protocol=protocol)
         self._client.on_connect = self._on_connect
         self._client.on_disconnect = self._on_disconnect
         self._client.on_message = self._on_message
+        self._client.max_inflight_messages_set(MAX_INFLIGHT)
 
         if use_tls:
             self._client.tls_set()
@@ -56,13 +115,11 @@ class MQTTClient:
     def connect(self) -> bool:
         """Connect to MQTT broker."""
         try:
+            self._connack.clear()
             self._client.connect(self._broker, self._port, keepalive=60)
             self._client.loop_start()
-            # Wait for connection
-            for _ in range(50):  # 5 seconds max
-                if self._connected:
-                    return True
-                time.sleep(0.1)
+            if self._connack.wait(timeout=5.0):
+                return self._connected
             logger.warning("MQTT connection timeout")
             return False
         except Exception as e:
@@ -74,30 +131,93 @@ class MQTTClient:
         self._client.loop_stop()
         self._client.disconnect()
         self._connected = False
+        self._connack.clear()
 
     def publish_alert(self, alert: dict) -> bool:
         """Publish a detection alert.
 
         Topic: {prefix}/alerts/{drone_id}
         """
-        topic = f"{self._prefix}/alerts/{self._drone_id}"
-        return self._publish(topic, alert)
+        return self._publish(self._alert_topic, alert)
+
+    def publish_alert_raw(self, payload: bytes) -> bool:
+        """Publish an already-serialized JSON alert.
+
+        Topic: {prefix}/alerts/{drone_id}
+        """
+        return self._publish_raw(self._alert_topic, payload)
+
+    def publish_alert_batch(self, alerts: list[Union[dict, bytes]]) -> bool:
+        """Publish several alerts from one frame.
+
+        Alerts may be dicts or already-serialized JSON bytes. Unless the
+        client was created with ``batch_alerts=True``, each alert is
+        published on its own to {prefix}/alerts/{drone_id}, exactly like
+        publish_alert().
+
+        With batching on, the alerts go out as one message.
+        Topic: {prefix}/alerts/{drone_id}/batch
+
+        Payload is a concatenation of ``varint(len) || json`` records.
+        On MQTT 5 sessions the PUBLISH also carries ``batch-format`` and
+        ``batch-size`` user properties. Batches larger than
+        MAX_BATCH_BYTES are split across several messages.
+        """
+        if not self._batch_alerts:
+            ok = True
+            for alert in alerts:
+                if isinstance(alert, dict):
+                    ok = self._publish(self._alert_topic, alert) and ok
+                else:
+                    ok = self._publish_raw(self._alert_topic, alert) and ok
+            return ok
+        topic = self._alert_batch_topic
+        if not self._connected:
+            logger.debug("Not connected, queuing message for %s", topic)
+            return False
+        ok = True
+        chunk: list[bytes] = []
+        chunk_bytes = 0
+        for alert in alerts:
+            try:
+                msg = _dumps(alert) if isinstance(alert, dict) else bytes(alert)
+            except Exception as e:
+                logger.error("Cannot serialize alert for %s: %s", topic, e)
+                ok = False
+                continue
+            record = _varint(len(msg)) + msg
+            if chunk and chunk_bytes + len(record) > MAX_BATCH_BYTES:
+                ok = self._publish_batch_chunk(topic, chunk) and ok
+                chunk, chunk_bytes = [], 0
+            chunk.append(record)
+            chunk_bytes += len(record)
+        if chunk:
+            ok = self._publish_batch_chunk(topic, chunk) and ok
+        return ok
+
+    def _publish_batch_chunk(self, topic: str, records: list[bytes]) -> bool:
+        properties = None
+        if self._protocol == mqtt.MQTTv5:
+            properties = Properties(PacketTypes.PUBLISH)
+            properties.UserProperty = [
+                ("batch-format", "v1"),
+                ("batch-size", str(len(records))),
+            ]
+        return self._publish_raw(topic, b"".join(records), properties)
 
     def publish_telemetry(self, telemetry: dict) -> bool:
         """Publish telemetry snapshot.
 
         Topic: {prefix}/telemetry/{drone_id}
         """
-        topic = f"{self._prefix}/telemetry/{self._drone_id}"
-        return self._publish(topic, telemetry)
+        return self._publish(self._telemetry_topic, telemetry)
 
     def publish_status(self, status: dict) -> bool:
         """Publish mission status update.
 
         Topic: {prefix}/status/{drone_id}
         """
-        topic = f"{self._prefix}/status/{self._drone_id}"
-        return self._publish(topic, status)
+        return self._publish(self._status_topic, status)
 
     def on_command(self, callback: Callable[[dict], None]) -> None:
         """Register a callback for incoming commands.
@@ -111,32 +231,59 @@ class MQTTClient:
             logger.debug("Not connected, queuing message for %s", topic)
             return False
         try:
-            msg = json.dumps(payload)
-            result = self._client.publish(topic, msg, qos=self._qos)
+            data = _dumps(payload)
+        except Exception as e:
+            logger.error("Cannot serialize message for %s: %s", topic, e)
+            return False
+        return self._publish_raw(topic, data)
+
+    def _publish_raw(
+        self,
+        topic: str,
+        payload,
+        properties: Optional[Properties] = None,
+    ) -> bool:
+        if not self._connected:
+            logger.debug("Not connected, queuing message for %s", topic)
+            return False
+        try:
+            result = self._client.publish(
+                topic, payload, qos=self._qos, properties=properties
+            )
             return result.rc == mqtt.MQTT_ERR_SUCCESS
         except Exception as e:
             logger.error("Publish failed on %s: %s", topic, e)
             return False
 
-    def _on_connect(self, client, userdata, flags, rc) -> None:
+    def _on_connect(self, client, userdata, flags, rc, properties=None) -> None:
+        # rc is an int on paho 1.x and a ReasonCode (compares equal to
+        # its numeric value) with the paho 2.x callback API
         if rc == 0:
             self._connected = True
             logger.info("MQTT connected to %s:%d", self._broker, self._port)
+            # Alerts are small — send them now rather than waiting on Nagle
+            try:
+                client.socket().setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            except (AttributeError, OSError) as e:
+                logger.debug("Could not set TCP_NODELAY: %s", e)
             # Subscribe to command topic
-            cmd_topic = f"{self._prefix}/commands/{self._drone_id}"
-            client.subscribe(cmd_topic, qos=self._qos)
-            logger.info("Subscribed to %s", cmd_topic)
+            client.subscribe(self._command_topic, qos=self._qos)
+            logger.info("Subscribed to %s", self._command_topic)
         else:
-            logger.error("MQTT connection failed: rc=%d", rc)
+            logger.error("MQTT connection failed: rc=%s", rc)
+        self._connack.set()
 
-    def _on_disconnect(self, client, userdata, rc) -> None:
+    def _on_disconnect(self, client, userdata, *args) -> None:
+        # paho 2.x: (flags, reason_code, properties)
+        # paho 1.x: (rc,) or (rc, properties) on MQTT 5
+        rc = args[1] if len(args) == 3 else args[0]
         self._connected = False
         if rc != 0:
-            logger.warning("MQTT unexpected disconnect: rc=%d", rc)
+            logger.warning("MQTT unexpected disconnect: rc=%s", rc)
 
     def _on_message(self, client, userdata, msg) -> None:
         try:
-            payload = json.loads(msg.payload.decode())
+            payload = _loads(msg.payload)
             logger.debug("Command received on %s", msg.topic)
             if self._command_callback:
                 self._command_callback(payload)
@@ -10,10 +10,14 @@ import hashlib
 import json
 import time
 import uuid
-from dataclasses import dataclass, field, asdict
-from datetime import datetime, timezone
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional
+from typing import Optional, Union
+
+try:
+    from uuid_utils import uuid7 as _native_uuid7
+except ImportError:  # optional: pip install uuid-utils
+    _native_uuid7 = getattr(uuid, "uuid7", None)  # stdlib on Python 3.14+
 
 
 _uuid7_counter = 0
@@ -27,8 +31,13 @@ def uuid7() -> str:
     naturally sortable by creation time — useful for audit trails.
 
     Uses a monotonic counter within the same millisecond to guarantee
-    sort order even when called in rapid succession.
+    sort order even when called in rapid succession. A native
+    generator (uuid-utils, or the stdlib on Python 3.14+) is used when
+    available; both keep the same per-process ordering guarantee.
     """
+    if _native_uuid7 is not None:
+        return str(_native_uuid7())
+
     global _uuid7_counter, _uuid7_last_ms
 
     timestamp_ms = int(time.time() * 1000)
@@ -51,6 +60,35 @@ def uuid7() -> str:
     return str(uuid.UUID(int=uuid_int))
 
 
+# Format -> (unix second, fmt rendered for that second, %f still literal)
+_utc_format_cache: dict[str, tuple[int, str]] = {}
+
+
+def format_utc(s: int, us: int, fmt: str = "%Y-%m-%dT%H:%M:%S.%f+00:00") -> str:
+    """Format a UTC time given as unix seconds and microseconds.
+
+    ``fmt`` takes ``time.strftime`` codes plus ``%f`` for zero-padded
+    microseconds, like ``datetime.strftime``. The strftime part is only
+    re-rendered when the second changes, once per format.
+    """
+    cache = _utc_format_cache.get(fmt)
+    if cache is None or cache[0] != s:
+        cache = _utc_format_cache[fmt] = (
+            s, time.strftime(fmt.replace("%f", "%%f"), time.gmtime(s))
+        )
+    return cache[1].replace("%f", "%06d" % us)
+
+
+def utc_now_iso() -> str:
+    """Current UTC time as ``YYYY-mm-ddTHH:MM:SS.ffffff+00:00``.
+
+    Equivalent to ``datetime.now(timezone.utc).isoformat()``, except the
+    microseconds are always present, so timestamps sort as strings.
+    """
+    s, us = divmod(time.time_ns() // 1000, 1_000_000)
+    return format_utc(s, us)
+
+
 class MissionStatus(str, Enum):
     DRAFT = "draft"
     ACTIVE = "active"
@@ -66,9 +104,7 @@ class Mission:
     id: str = field(default_factory=uuid7)
     type: str = "surveillance"
     status: MissionStatus = MissionStatus.DRAFT
-    created_at: str = field(
-        default_factory=lambda: datetime.now(timezone.utc).isoformat()
-    )
+    created_at: str = field(default_factory=utc_now_iso)
     created_by: str = ""
     waypoints: list[dict] = field(default_factory=list)
     parameters: dict = field(default_factory=lambda: {
@@ -80,15 +116,24 @@ class Mission:
     })
 
     def to_dict(self) -> dict:
-        d = asdict(self)
-        d["status"] = self.status.value
-        return d
+        """Plain dict of the mission for JSON serialization.
+
+        ``waypoints`` and ``parameters`` are shared with the mission,
+        not copied — copy them before mutating the result.
+        """
+        return {
+            "id": self.id,
+            "type": self.type,
+            "status": self.status.value,
+            "created_at": self.created_at,
+            "created_by": self.created_by,
+            "waypoints": self.waypoints,
+            "parameters": self.parameters,
+        }
 
     @classmethod
     def from_dict(cls, data: dict) -> Mission:
-        data = data.copy()
-        data["status"] = MissionStatus(data["status"])
-        return cls(**data)
+        return cls(**{**data, "status": MissionStatus(data["status"])})
 
     def to_json(self) -> str:
         return json.dumps(self.to_dict(), indent=2)
@@ -100,9 +145,7 @@ class Finding:
 
     id: str = field(default_factory=uuid7)
     mission_id: str = ""
-    timestamp: str = field(
-        default_factory=lambda: datetime.now(timezone.utc).isoformat()
-    )
+    timestamp: str = field(default_factory=utc_now_iso)
     lat: float = 0.0
     lon: float = 0.0
     alt: float = 0.0
@@ -111,6 +154,20 @@ class Finding:
     image_path: str = ""
     image_hash: str = ""
     signature: str = ""  # Ed25519 signature, set by security layer
+    # Memoized signable_payload() bytes; cleared when a signed field changes
+    _signable_cache: Optional[bytes] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    _SIGNED_FIELDS = frozenset({
+        "mission_id", "timestamp", "lat", "lon", "alt",
+        "detection_class", "confidence", "image_hash",
+    })
+
+    def __setattr__(self, name, value):
+        if name in Finding._SIGNED_FIELDS:
+            object.__setattr__(self, "_signable_cache", None)
+        object.__setattr__(self, name, value)
 
     def signable_payload(self) -> bytes:
         """The canonical byte string that gets signed.
@@ -118,28 +175,51 @@ class Finding:
         Includes all fields that matter for evidence integrity.
         Signature and id are excluded (signature is the output,
         id is assigned before signing).
+
+        The bytes are computed once and reused (signing, alert
+        publishing) until one of the signed fields is reassigned.
         """
-        parts = [
-            self.mission_id,
-            self.timestamp,
-            f"{self.lat:.8f}",
-            f"{self.lon:.8f}",
-            f"{self.alt:.2f}",
-            self.detection_class,
-            f"{self.confidence:.4f}",
-            self.image_hash,
-        ]
-        return "|".join(parts).encode("utf-8")
+        if self._signable_cache is None:
+            parts = [
+                self.mission_id,
+                self.timestamp,
+                f"{self.lat:.8f}",
+                f"{self.lon:.8f}",
+                f"{self.alt:.2f}",
+                self.detection_class,
+                f"{self.confidence:.4f}",
+                self.image_hash,
+            ]
+            self._signable_cache = "|".join(parts).encode("utf-8")
+        return self._signable_cache
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        return {
+            "id": self.id,
+            "mission_id": self.mission_id,
+            "timestamp": self.timestamp,
+            "lat": self.lat,
+            "lon": self.lon,
+            "alt": self.alt,
+            "detection_class": self.detection_class,
+            "confidence": self.confidence,
+            "image_path": self.image_path,
+            "image_hash": self.image_hash,
+            "signature": self.signature,
+        }
 
     @classmethod
     def from_dict(cls, data: dict) -> Finding:
         return cls(**data)
 
     @staticmethod
-    def hash_image(image_bytes: bytes) -> str:
+    def hash_image(image_bytes: Union[bytes, bytearray, memoryview]) -> str:
+        """SHA-256 of an encoded image.
+
+        Accepts any buffer-protocol object (bytes, memoryview, uint8
+        ndarray) and hashes it in a single call, so OpenSSL can use the
+        CPU's SHA extensions without an intermediate copy.
+        """
         return hashlib.sha256(image_bytes).hexdigest()
 
 
@@ -152,38 +232,78 @@ class AuditEntry:
     """
 
     id: str = field(default_factory=uuid7)
-    timestamp: str = field(
-        default_factory=lambda: datetime.now(timezone.utc).isoformat()
-    )
+    timestamp: str = field(default_factory=utc_now_iso)
     actor: str = ""          # drone_id or operator_id
     action: str = ""         # e.g., "mission_start", "detection", "command_received"
     details: dict = field(default_factory=dict)
     prev_hash: str = ""      # SHA-256 of previous entry
     signature: str = ""      # Ed25519 signature
+    # Memoized details_json() / signable_payload() / content_hash();
+    # cleared when a hashed field is reassigned. Mutating ``details`` in
+    # place after signing is not supported.
+    _details_cache: Optional[str] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _signable_cache: Optional[bytes] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _hash_cache: Optional[str] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    _SIGNED_FIELDS = frozenset({
+        "timestamp", "actor", "action", "details", "prev_hash",
+    })
+
+    def __setattr__(self, name, value):
+        if name in AuditEntry._SIGNED_FIELDS:
+            if name == "details":
+                object.__setattr__(self, "_details_cache", None)
+            object.__setattr__(self, "_signable_cache", None)
+            object.__setattr__(self, "_hash_cache", None)
+        elif name == "signature":
+            object.__setattr__(self, "_hash_cache", None)
+        object.__setattr__(self, name, value)
+
+    def details_json(self) -> str:
+        """Canonical JSON of ``details``, as signed and as stored."""
+        if self._details_cache is None:
+            self._details_cache = json.dumps(self.details, sort_keys=True)
+        return self._details_cache
 
     def signable_payload(self) -> bytes:
-        parts = [
-            self.timestamp,
-            self.actor,
-            self.action,
-            json.dumps(self.details, sort_keys=True),
-            self.prev_hash,
-        ]
-        return "|".join(parts).encode("utf-8")
+        if self._signable_cache is None:
+            parts = [
+                self.timestamp,
+                self.actor,
+                self.action,
+                self.details_json(),
+                self.prev_hash,
+            ]
+            self._signable_cache = "|".join(parts).encode("utf-8")
+        return self._signable_cache
 
     def content_hash(self) -> str:
         """Hash of this entry's content, used as prev_hash for next entry."""
-        payload = self.signable_payload() + self.signature.encode("utf-8")
-        return hashlib.sha256(payload).hexdigest()
+        if self._hash_cache is None:
+            payload = self.signable_payload() + self.signature.encode("utf-8")
+            self._hash_cache = hashlib.sha256(payload).hexdigest()
+        return self._hash_cache
 
     def to_dict(self) -> dict:
-        d = asdict(self)
-        d["details"] = json.dumps(self.details, sort_keys=True)
-        return d
+        return {
+            "id": self.id,
+            "timestamp": self.timestamp,
+            "actor": self.actor,
+            "action": self.action,
+            "details": self.details_json(),
+            "prev_hash": self.prev_hash,
+            "signature": self.signature,
+        }
 
     @classmethod
     def from_dict(cls, data: dict) -> AuditEntry:
-        data = data.copy()
-        if isinstance(data.get("details"), str):
-            data["details"] = json.loads(data["details"])
+        details = data.get("details")
+        if isinstance(details, str):
+            return cls(**{**data, "details": json.loads(details)})
         return cls(**data)
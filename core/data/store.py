@@ -8,25 +8,165 @@ from __future__ import annotations
 
 import json
 import sqlite3
+import threading
+import weakref
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 
-from core.data.models import Mission, MissionStatus, Finding, AuditEntry
+from core.data.models import Mission, MissionStatus, Finding, AuditEntry, utc_now_iso
+
+SYNCHRONOUS_LEVELS = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+# Stored in PRAGMA user_version once the tables below exist
+SCHEMA_VERSION = 3
+
+_FINDING_COLUMNS = """id, mission_id, timestamp, lat, lon, alt,
+    detection_class, confidence, image_path, image_hash, signature"""
+
+_MISSION_COLUMNS = "id, type, status, created_at, created_by, waypoints, parameters"
+
+_INSERT_MISSION = f"""INSERT OR REPLACE INTO missions ({_MISSION_COLUMNS})
+    VALUES (?, ?, ?, ?, ?, ?, ?)"""
+
+_INSERT_FINDING = f"""INSERT INTO findings ({_FINDING_COLUMNS})
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+_INSERT_AUDIT = """INSERT INTO audit_log
+    (id, timestamp, actor, action, details, prev_hash, signature)
+    VALUES (?, ?, ?, ?, ?, ?, ?)"""
+
+
+def _mission_row(mission: Mission) -> tuple:
+    return (
+        mission.id,
+        mission.type,
+        mission.status.value,
+        mission.created_at,
+        mission.created_by,
+        json.dumps(mission.waypoints),
+        json.dumps(mission.parameters),
+    )
+
+
+def _finding_row(finding: Finding) -> tuple:
+    return (
+        finding.id,
+        finding.mission_id,
+        finding.timestamp,
+        finding.lat,
+        finding.lon,
+        finding.alt,
+        finding.detection_class,
+        finding.confidence,
+        finding.image_path,
+        finding.image_hash,
+        finding.signature,
+    )
+
+
+def _audit_row(entry: AuditEntry) -> tuple:
+    return (
+        entry.id,
+        entry.timestamp,
+        entry.actor,
+        entry.action,
+        entry.details_json(),
+        entry.prev_hash,
+        entry.signature,
+    )
+
+
+class _Reader:
+    """One thread's read-only connection, closed when the thread exits.
+
+    Held only by the thread-local, so it is freed as soon as its thread
+    ends. The connection itself can't be relied on for that: it sits in
+    a reference cycle with its statement cache and would stay open until
+    the cycle collector ran.
+    """
+
+    __slots__ = ("conn", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __del__(self) -> None:
+        self.conn.close()
 
 
 class DataStore:
     """Local SQLite store for missions, findings, and audit trail."""
 
-    def __init__(self, db_path: str = "/var/drone/missions.db"):
+    def __init__(
+        self,
+        db_path: str = "/var/drone/missions.db",
+        synchronous: str = "NORMAL",
+    ):
+        """Open (and create if needed) the store.
+
+        Args:
+            db_path: SQLite database file.
+            synchronous: SQLite sync level. Under WAL, NORMAL only fsyncs
+                at checkpoints — a power cut can lose the last few
+                commits but never corrupts the database, and a truncated
+                audit tail still verifies as a valid (shorter) chain.
+                Use FULL to fsync every commit.
+        """
+        synchronous = synchronous.upper()
+        if synchronous not in SYNCHRONOUS_LEVELS:
+            raise ValueError(f"Invalid synchronous level: {synchronous}")
         self._db_path = db_path
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
-        self._conn = sqlite3.connect(db_path)
-        self._conn.row_factory = sqlite3.Row
+
+        # One writer connection, shared and serialized by _write_lock.
+        # Reads go through a per-thread query_only connection, so under
+        # WAL they never queue behind a commit in progress.
+        self._conn = self._connect()
         self._conn.execute("PRAGMA journal_mode=WAL")
-        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.execute(f"PRAGMA synchronous={synchronous}")
+        self._conn.execute("PRAGMA wal_autocheckpoint=1000")
+        self._write_lock = threading.RLock()
+        self._local = threading.local()
+        # Weak, so a reader closes when its thread exits instead of
+        # living until close()
+        self._readers: weakref.WeakSet[_Reader] = weakref.WeakSet()
+        self._readers_lock = threading.Lock()
+        # Content hash of the newest audit entry, and the writer's
+        # data_version when it was read (see get_last_audit_hash)
+        self._last_audit_hash: Optional[str] = None
+        self._audit_data_version: Optional[int] = None
         self._init_tables()
 
+    def _connect(self) -> sqlite3.Connection:
+        # Connections may be closed from another thread in close()
+        conn = sqlite3.connect(self._db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-65536")  # 64 MiB
+        conn.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        """This thread's read-only connection, opened on first use."""
+        reader = getattr(self._local, "reader", None)
+        if reader is None:
+            if self._db_path == ":memory:":
+                # Each connection would get its own empty in-memory DB
+                return self._conn
+            conn = self._connect()
+            conn.execute("PRAGMA query_only=1")
+            reader = self._local.reader = _Reader(conn)
+            with self._readers_lock:
+                self._readers.add(reader)
+        return reader.conn
+
     def _init_tables(self) -> None:
+        # An existing database already has the schema — skip the DDL and
+        # its write transaction so read-only commands open cheaply.
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
         self._conn.executescript("""
             CREATE TABLE IF NOT EXISTS missions (
                 id TEXT PRIMARY KEY,
@@ -63,37 +203,40 @@ class DataStore:
                 signature TEXT
             );
 
-            CREATE INDEX IF NOT EXISTS idx_findings_mission
-                ON findings(mission_id);
+            CREATE TABLE IF NOT EXISTS audit_checkpoints (
+                entry_id TEXT PRIMARY KEY,
+                entry_rowid INTEGER NOT NULL,
+                entry_count INTEGER NOT NULL,
+                running_hash TEXT NOT NULL,
+                verified_at TEXT NOT NULL
+            );
+
+            -- (mission_id, timestamp) serves get_findings' filter and
+            -- ORDER BY from the index; it supersedes the mission_id index
+            DROP INDEX IF EXISTS idx_findings_mission;
+            CREATE INDEX IF NOT EXISTS idx_findings_mission_ts
+                ON findings(mission_id, timestamp);
+            CREATE INDEX IF NOT EXISTS idx_missions_status_created
+                ON missions(status, created_at);
             CREATE INDEX IF NOT EXISTS idx_findings_timestamp
                 ON findings(timestamp);
             CREATE INDEX IF NOT EXISTS idx_audit_timestamp
                 ON audit_log(timestamp);
         """)
+        self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         self._conn.commit()
 
     # ── Missions ──────────────────────────────────────────────
 
     def save_mission(self, mission: Mission) -> None:
-        self._conn.execute(
-            """INSERT OR REPLACE INTO missions
-               (id, type, status, created_at, created_by, waypoints, parameters)
-               VALUES (?, ?, ?, ?, ?, ?, ?)""",
-            (
-                mission.id,
-                mission.type,
-                mission.status.value,
-                mission.created_at,
-                mission.created_by,
-                json.dumps(mission.waypoints),
-                json.dumps(mission.parameters),
-            ),
-        )
-        self._conn.commit()
+        row = _mission_row(mission)
+        with self._write_lock:
+            self._conn.execute(_INSERT_MISSION, row)
+            self._conn.commit()
 
     def get_mission(self, mission_id: str) -> Optional[Mission]:
-        row = self._conn.execute(
-            "SELECT * FROM missions WHERE id = ?", (mission_id,)
+        row = self._reader().execute(
+            f"SELECT {_MISSION_COLUMNS} FROM missions WHERE id = ?", (mission_id,)
         ).fetchone()
         if not row:
             return None
@@ -108,21 +251,23 @@ class DataStore:
         )
 
     def update_mission_status(self, mission_id: str, status: MissionStatus) -> None:
-        self._conn.execute(
-            "UPDATE missions SET status = ? WHERE id = ?",
-            (status.value, mission_id),
-        )
-        self._conn.commit()
+        with self._write_lock:
+            self._conn.execute(
+                "UPDATE missions SET status = ? WHERE id = ?",
+                (status.value, mission_id),
+            )
+            self._conn.commit()
 
     def list_missions(self, status: Optional[MissionStatus] = None) -> list[Mission]:
         if status:
-            rows = self._conn.execute(
-                "SELECT * FROM missions WHERE status = ? ORDER BY created_at DESC",
+            rows = self._reader().execute(
+                f"SELECT {_MISSION_COLUMNS} FROM missions"
+                " WHERE status = ? ORDER BY created_at DESC",
                 (status.value,),
             ).fetchall()
         else:
-            rows = self._conn.execute(
-                "SELECT * FROM missions ORDER BY created_at DESC"
+            rows = self._reader().execute(
+                f"SELECT {_MISSION_COLUMNS} FROM missions ORDER BY created_at DESC"
             ).fetchall()
         return [
             Mission(
@@ -140,36 +285,33 @@ class DataStore:
     # ── Findings ──────────────────────────────────────────────
 
     def save_finding(self, finding: Finding) -> None:
-        self._conn.execute(
-            """INSERT INTO findings
-               (id, mission_id, timestamp, lat, lon, alt,
-                detection_class, confidence, image_path, image_hash, signature)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            (
-                finding.id,
-                finding.mission_id,
-                finding.timestamp,
-                finding.lat,
-                finding.lon,
-                finding.alt,
-                finding.detection_class,
-                finding.confidence,
-                finding.image_path,
-                finding.image_hash,
-                finding.signature,
-            ),
-        )
-        self._conn.commit()
+        row = _finding_row(finding)
+        with self._write_lock:
+            self._conn.execute(_INSERT_FINDING, row)
+            self._conn.commit()
+
+    def save_findings_batch(self, findings: Iterable[Finding]) -> None:
+        """Insert several findings in one transaction (one commit).
+
+        Accepts any iterable. Rows are built before the write lock is
+        taken, so a slow generator never holds up other writers.
+        """
+        rows = [_finding_row(f) for f in findings]
+        if not rows:
+            return
+        with self._write_lock, self._conn:
+            self._conn.executemany(_INSERT_FINDING, rows)
 
     def get_findings(self, mission_id: str) -> list[Finding]:
-        rows = self._conn.execute(
-            "SELECT * FROM findings WHERE mission_id = ? ORDER BY timestamp",
+        rows = self._reader().execute(
+            f"SELECT {_FINDING_COLUMNS} FROM findings"
+            " WHERE mission_id = ? ORDER BY timestamp",
             (mission_id,),
         ).fetchall()
         return [Finding(**dict(r)) for r in rows]
 
     def get_finding_count(self, mission_id: str) -> int:
-        row = self._conn.execute(
+        row = self._reader().execute(
             "SELECT COUNT(*) as cnt FROM findings WHERE mission_id = ?",
             (mission_id,),
         ).fetchone()
@@ -178,61 +320,160 @@ class DataStore:
     # ── Audit Log ─────────────────────────────────────────────
 
     def append_audit(self, entry: AuditEntry) -> None:
-        self._conn.execute(
-            """INSERT INTO audit_log
-               (id, timestamp, actor, action, details, prev_hash, signature)
-               VALUES (?, ?, ?, ?, ?, ?, ?)""",
-            (
-                entry.id,
-                entry.timestamp,
-                entry.actor,
-                entry.action,
-                json.dumps(entry.details, sort_keys=True),
-                entry.prev_hash,
-                entry.signature,
-            ),
-        )
-        self._conn.commit()
+        row = _audit_row(entry)
+        with self._write_lock:
+            self._conn.execute(_INSERT_AUDIT, row)
+            self._conn.commit()
+            self._last_audit_hash = entry.content_hash()
+
+    def append_audit_batch(self, entries: list[AuditEntry]) -> None:
+        """Append already-chained entries in one transaction (one commit).
+
+        Entries must be in chain order, each ``prev_hash`` linking to
+        the one before it.
+        """
+        if not entries:
+            return
+        rows = [_audit_row(e) for e in entries]
+        with self._write_lock:
+            with self._conn:
+                self._conn.executemany(_INSERT_AUDIT, rows)
+            self._last_audit_hash = entries[-1].content_hash()
 
     def get_last_audit_hash(self) -> str:
         """Get the content hash of the most recent audit entry.
 
         Returns empty string if no entries exist (genesis).
+
+        The hash is kept in memory and updated by our own appends.
+        PRAGMA data_version changes when another connection (e.g. a CLI
+        command in another process) commits, and forces a re-read.
         """
-        row = self._conn.execute(
-            "SELECT * FROM audit_log ORDER BY timestamp DESC LIMIT 1"
-        ).fetchone()
-        if not row:
-            return ""
-        entry = AuditEntry.from_dict(dict(row))
-        return entry.content_hash()
+        with self._write_lock:
+            version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if self._last_audit_hash is None or version != self._audit_data_version:
+                row = self._conn.execute(
+                    "SELECT * FROM audit_log ORDER BY rowid DESC LIMIT 1"
+                ).fetchone()
+                self._last_audit_hash = (
+                    AuditEntry.from_dict(dict(row)).content_hash() if row else ""
+                )
+                self._audit_data_version = version
+            return self._last_audit_hash
 
     def get_audit_log(self, limit: int = 100) -> list[AuditEntry]:
-        rows = self._conn.execute(
+        rows = self._reader().execute(
             "SELECT * FROM audit_log ORDER BY timestamp DESC LIMIT ?",
             (limit,),
         ).fetchall()
         return [AuditEntry.from_dict(dict(r)) for r in rows]
 
-    def verify_audit_chain(self) -> tuple[bool, int]:
-        """Verify the entire audit hash chain.
+    def iter_audit_log(self, limit: Optional[int] = 100) -> Iterator[AuditEntry]:
+        """Yield the most recent ``limit`` entries, oldest first.
 
-        Returns (is_valid, entries_checked). If invalid, entries_checked
-        indicates where the chain broke.
+        ``limit=None`` yields the whole log. Rows are read from the
+        cursor as they are consumed, so callers can print entries
+        without holding the whole result in memory.
         """
-        rows = self._conn.execute(
-            "SELECT * FROM audit_log ORDER BY timestamp ASC"
-        ).fetchall()
-        if not rows:
-            return True, 0
+        if limit is None:
+            cursor = self._reader().execute(
+                "SELECT * FROM audit_log ORDER BY timestamp ASC"
+            )
+        else:
+            cursor = self._reader().execute(
+                """SELECT * FROM (
+                       SELECT * FROM audit_log ORDER BY timestamp DESC LIMIT ?
+                   ) ORDER BY timestamp ASC""",
+                (limit,),
+            )
+        for row in cursor:
+            yield AuditEntry.from_dict(dict(row))
+
+    def verify_audit_chain(
+        self, batch_size: int = 4096, incremental: bool = False
+    ) -> tuple[bool, int]:
+        """Verify the audit hash chain.
 
+        Entries are replayed in insertion (rowid) order, which is the
+        order they were chained in, ``batch_size`` rows at a time so
+        memory stays flat however long the log is. The default replays
+        the whole log and writes nothing. With ``incremental=True``
+        verification resumes from the latest checkpoint, only replays
+        entries appended after it, and a successful pass records a new
+        checkpoint (last entry, entry count, its content hash) — so the
+        database must be writable.
+
+        Returns (is_valid, entries_checked). entries_checked counts from
+        the start of the log, including entries covered by the
+        checkpoint. If invalid, it indicates where the chain broke.
+        """
+        conn = self._reader()
         prev_hash = ""
-        for i, row in enumerate(rows):
-            entry = AuditEntry.from_dict(dict(row))
-            if entry.prev_hash != prev_hash:
-                return False, i
-            prev_hash = entry.content_hash()
-        return True, len(rows)
+        i = 0
+        last = None
+        checkpoint = None
+        if incremental:
+            checkpoint = conn.execute(
+                "SELECT * FROM audit_checkpoints ORDER BY entry_rowid DESC LIMIT 1"
+            ).fetchone()
+        if checkpoint is not None:
+            # The anchor entry itself must be unchanged for the
+            # checkpoint to vouch for everything before it.
+            anchor = conn.execute(
+                "SELECT * FROM audit_log WHERE rowid = ?",
+                (checkpoint["entry_rowid"],),
+            ).fetchone()
+            if (
+                anchor is None
+                or anchor["id"] != checkpoint["entry_id"]
+                or AuditEntry.from_dict(dict(anchor)).content_hash()
+                != checkpoint["running_hash"]
+            ):
+                return False, checkpoint["entry_count"] - 1
+            prev_hash = checkpoint["running_hash"]
+            i = checkpoint["entry_count"]
+            cursor = conn.execute(
+                "SELECT rowid AS _rowid, * FROM audit_log WHERE rowid > ? ORDER BY rowid",
+                (checkpoint["entry_rowid"],),
+            )
+        else:
+            cursor = conn.execute(
+                "SELECT rowid AS _rowid, * FROM audit_log ORDER BY rowid"
+            )
+
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                data = dict(row)
+                rowid = data.pop("_rowid")
+                entry = AuditEntry.from_dict(data)
+                if entry.prev_hash != prev_hash:
+                    return False, i
+                prev_hash = entry.content_hash()
+                i += 1
+                last = (entry.id, rowid)
+
+        if incremental and last is not None:
+            self._save_audit_checkpoint(last[0], last[1], i, prev_hash)
+        return True, i
+
+    def _save_audit_checkpoint(
+        self, entry_id: str, rowid: int, count: int, running_hash: str
+    ) -> None:
+        with self._write_lock, self._conn:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO audit_checkpoints
+                   (entry_id, entry_rowid, entry_count, running_hash, verified_at)
+                   VALUES (?, ?, ?, ?, ?)""",
+                (entry_id, rowid, count, running_hash, utc_now_iso()),
+            )
 
     def close(self) -> None:
-        self._conn.close()
+        with self._readers_lock:
+            for reader in list(self._readers):
+                reader.conn.close()
+            self._readers.clear()
+        with self._write_lock:
+            self._conn.close()
@@ -9,9 +9,9 @@ This module talks to the flight controller only — all intelligence
 
 from __future__ import annotations
 
-import asyncio
 import logging
 import math
+import threading
 import time
 from typing import Optional
 
@@ -28,6 +28,14 @@ COPTER_MODES = {
     "LAND": 9, "DRIFT": 11, "SPORT": 13, "BRAKE": 17,
     "SMART_RTL": 21, "GUIDED_NOGPS": 20,
 }
+COPTER_MODE_NAMES = {num: name for name, num in COPTER_MODES.items()}
+
+# Longest the telemetry thread blocks waiting for MAVLink data, which
+# also bounds how long stop_telemetry() waits for it to notice
+IDLE_WAIT_S = 0.25
+
+# Messages that together give mode, GPS fix and battery state
+STATUS_MESSAGES = frozenset({"HEARTBEAT", "GPS_RAW_INT", "SYS_STATUS"})
 
 
 class FlightController:
@@ -46,6 +54,23 @@ class FlightController:
         self._telemetry = TelemetryStore()
         self._running = False
         self._connected = False
+        self._thread: Optional[threading.Thread] = None
+        self._recv_lock = threading.Lock()
+        # COMMAND_ACKs seen by the telemetry thread: command id -> result
+        self._acks: dict[int, int] = {}
+        self._ack_cond = threading.Condition()
+        # MAVLink message types processed since connect()
+        self._seen_types: set[str] = set()
+        # MAVLink message type -> handler; other types are ignored
+        self._handlers = {
+            "COMMAND_ACK": self._on_command_ack,
+            "HEARTBEAT": self._on_heartbeat,
+            "GLOBAL_POSITION_INT": self._on_global_position_int,
+            "GPS_RAW_INT": self._on_gps_raw_int,
+            "SYS_STATUS": self._on_sys_status,
+            "ATTITUDE": self._on_attitude,
+            "VFR_HUD": self._on_vfr_hud,
+        }
 
     @property
     def telemetry(self) -> TelemetryState:
@@ -75,6 +100,7 @@ class FlightController:
                 return False
 
             self._connected = True
+            self._seen_types.clear()
             self._telemetry.update(connected=True)
             logger.info(
                 "Connected. System %d, Component %d",
@@ -84,6 +110,7 @@ class FlightController:
 
             # Request data streams
             self._request_data_streams()
+            self.start_telemetry()
             return True
         except Exception as e:
             logger.error("Connection failed: %s", e)
@@ -102,70 +129,135 @@ class FlightController:
             1,  # start
         )
 
+    def start_telemetry(self, interval: float = 0.02) -> None:
+        """Start the background thread that drains MAVLink messages.
+
+        Started automatically by connect(). Consumers then just read
+        ``telemetry`` / ``location`` or block on wait_for_update().
+
+        The thread sleeps in select() on the link's descriptor until data
+        arrives; ``interval`` is the polling period used only for links
+        that have no selectable descriptor.
+        """
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._telemetry_loop, args=(interval,), daemon=True
+        )
+        self._thread.start()
+
+    def stop_telemetry(self) -> None:
+        """Stop the background telemetry thread."""
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def wait_for_update(self, timeout: float) -> bool:
+        """Block until new telemetry arrives. Returns False on timeout."""
+        return self._telemetry.wait_for_update(timeout)
+
+    def wait_for_telemetry(self, timeout: float = 1.0) -> bool:
+        """Block until mode, GPS and battery have each been reported once.
+
+        Returns False if any of them is still missing after ``timeout``.
+        """
+        deadline = time.monotonic() + timeout
+        while not STATUS_MESSAGES <= self._seen_types:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self._telemetry.wait_for_update(remaining)
+        return True
+
+    def _telemetry_loop(self, interval: float) -> None:
+        while self._running:
+            try:
+                self.update_telemetry()
+            except Exception as e:
+                logger.warning("Telemetry read failed: %s", e)
+            mav = self._mav
+            if mav is not None and getattr(mav, "fd", None) is not None:
+                mav.select(IDLE_WAIT_S)
+            else:
+                time.sleep(interval)
+
     def update_telemetry(self) -> None:
         """Read and process pending MAVLink messages.
 
-        Call this in a loop or on a timer. Non-blocking — processes
-        whatever messages are available right now.
+        Non-blocking — processes whatever messages are available right
+        now. The background telemetry thread calls this continuously;
+        direct calls are safe but rarely needed.
         """
         if not self._mav:
             return
 
+        with self._recv_lock:
+            self._drain_messages()
+
+    def _drain_messages(self) -> None:
+        recv_match = self._mav.recv_match
+        handlers = self._handlers
+        seen = self._seen_types
         while True:
-            msg = self._mav.recv_match(blocking=False)
+            msg = recv_match(blocking=False)
             if msg is None:
                 break
 
             msg_type = msg.get_type()
+            seen.add(msg_type)
+            handler = handlers.get(msg_type)
+            if handler is not None:
+                handler(msg)
+
+    def _on_command_ack(self, msg) -> None:
+        with self._ack_cond:
+            self._acks[msg.command] = msg.result
+            self._ack_cond.notify_all()
+
+    def _on_heartbeat(self, msg) -> None:
+        self._telemetry.update(
+            armed=bool(msg.base_mode & mavutil.mavlink.MAV_MODE_FLAG_SAFETY_ARMED),
+            mode=COPTER_MODE_NAMES.get(msg.custom_mode, ""),
+            connected=True,
+            last_heartbeat=time.strftime("%H:%M:%S"),
+        )
 
-            if msg_type == "HEARTBEAT":
-                mode_num = msg.custom_mode
-                mode_name = ""
-                for name, num in COPTER_MODES.items():
-                    if num == mode_num:
-                        mode_name = name
-                        break
-                self._telemetry.update(
-                    armed=bool(msg.base_mode & mavutil.mavlink.MAV_MODE_FLAG_SAFETY_ARMED),
-                    mode=mode_name,
-                    connected=True,
-                    last_heartbeat=time.strftime("%H:%M:%S"),
-                )
-
-            elif msg_type == "GLOBAL_POSITION_INT":
-                self._telemetry.update(
-                    lat=msg.lat / 1e7,
-                    lon=msg.lon / 1e7,
-                    alt_msl=msg.alt / 1000.0,
-                    alt_rel=msg.relative_alt / 1000.0,
-                    vx=msg.vx / 100.0,
-                    vy=msg.vy / 100.0,
-                    vz=msg.vz / 100.0,
-                    yaw=msg.hdg / 100.0,
-                )
-
-            elif msg_type == "GPS_RAW_INT":
-                self._telemetry.update(
-                    gps_fix=msg.fix_type,
-                    gps_satellites=msg.satellites_visible,
-                )
-
-            elif msg_type == "SYS_STATUS":
-                battery_pct = msg.battery_remaining if msg.battery_remaining >= 0 else -1
-                self._telemetry.update(
-                    battery_pct=battery_pct,
-                    battery_voltage=msg.voltage_battery / 1000.0,
-                )
-
-            elif msg_type == "ATTITUDE":
-                self._telemetry.update(
-                    roll=math.degrees(msg.roll),
-                    pitch=math.degrees(msg.pitch),
-                    yaw=math.degrees(msg.yaw),
-                )
-
-            elif msg_type == "VFR_HUD":
-                self._telemetry.update(groundspeed=msg.groundspeed)
+    def _on_global_position_int(self, msg) -> None:
+        self._telemetry.update(
+            lat=msg.lat / 1e7,
+            lon=msg.lon / 1e7,
+            alt_msl=msg.alt / 1000.0,
+            alt_rel=msg.relative_alt / 1000.0,
+            vx=msg.vx / 100.0,
+            vy=msg.vy / 100.0,
+            vz=msg.vz / 100.0,
+            yaw=msg.hdg / 100.0,
+        )
+
+    def _on_gps_raw_int(self, msg) -> None:
+        self._telemetry.update(
+            gps_fix=msg.fix_type,
+            gps_satellites=msg.satellites_visible,
+        )
+
+    def _on_sys_status(self, msg) -> None:
+        battery_pct = msg.battery_remaining if msg.battery_remaining >= 0 else -1
+        self._telemetry.update(
+            battery_pct=battery_pct,
+            battery_voltage=msg.voltage_battery / 1000.0,
+        )
+
+    def _on_attitude(self, msg) -> None:
+        self._telemetry.update(
+            roll=math.degrees(msg.roll),
+            pitch=math.degrees(msg.pitch),
+            yaw=math.degrees(msg.yaw),
+        )
+
+    def _on_vfr_hud(self, msg) -> None:
+        self._telemetry.update(groundspeed=msg.groundspeed)
 
     # ── Flight Commands ───────────────────────────────────────
 
@@ -173,9 +265,7 @@ class FlightController:
         """Arm the drone motors."""
         if not self._mav:
             return False
-        self._mav.mav.command_long_send(
-            self._mav.target_system,
-            self._mav.target_component,
+        self._command_long(
             mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM,
             0, 1, 0, 0, 0, 0, 0, 0,
         )
@@ -185,9 +275,7 @@ class FlightController:
         """Disarm the drone motors."""
         if not self._mav:
             return False
-        self._mav.mav.command_long_send(
-            self._mav.target_system,
-            self._mav.target_component,
+        self._command_long(
             mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM,
             0, 0, 0, 0, 0, 0, 0, 0,
         )
@@ -216,9 +304,7 @@ class FlightController:
         """Takeoff to specified altitude. Drone must be armed and in GUIDED mode."""
         if not self._mav:
             return False
-        self._mav.mav.command_long_send(
-            self._mav.target_system,
-            self._mav.target_component,
+        self._command_long(
             mavutil.mavlink.MAV_CMD_NAV_TAKEOFF,
             0, 0, 0, 0, 0, 0, 0, altitude_m,
         )
@@ -254,9 +340,7 @@ class FlightController:
         """Set the target groundspeed."""
         if not self._mav:
             return False
-        self._mav.mav.command_long_send(
-            self._mav.target_system,
-            self._mav.target_component,
+        self._command_long(
             mavutil.mavlink.MAV_CMD_DO_CHANGE_SPEED,
             0,
             0,          # speed type: groundspeed
@@ -276,43 +360,69 @@ class FlightController:
 
     def reached_waypoint(self, lat: float, lon: float, tolerance_m: float = 2.0) -> bool:
         """Check if drone is within tolerance of a waypoint."""
-        current = self._telemetry.state
-        dist = self._haversine(current.lat, current.lon, lat, lon)
-        return dist <= tolerance_m
+        cur_lat, cur_lon, _ = self._telemetry.location
+        return self._haversine(cur_lat, cur_lon, lat, lon) <= tolerance_m
 
     # ── Internal ──────────────────────────────────────────────
 
+    def _command_long(self, command: int, *params: float) -> None:
+        """Send COMMAND_LONG, discarding any stale ACK for the command."""
+        with self._ack_cond:
+            self._acks.pop(command, None)
+        self._mav.mav.command_long_send(
+            self._mav.target_system,
+            self._mav.target_component,
+            command,
+            *params,
+        )
+
     def _wait_for_ack(self, command_id: int, timeout: float = 5.0) -> bool:
         """Wait for COMMAND_ACK for a specific command."""
         if not self._mav:
             return False
+        if self._running:
+            result = self._wait_for_ack_from_thread(command_id, timeout)
+        else:
+            result = self._recv_ack(command_id, timeout)
+        if result is None:
+            logger.warning("Timeout waiting for ACK on command %d", command_id)
+            return False
+        if result != mavutil.mavlink.MAV_RESULT_ACCEPTED:
+            logger.warning("Command %d rejected: result=%d", command_id, result)
+            return False
+        return True
+
+    def _wait_for_ack_from_thread(self, command_id: int, timeout: float) -> Optional[int]:
+        """Wait for the telemetry thread to see the ACK."""
+        with self._ack_cond:
+            if self._ack_cond.wait_for(lambda: command_id in self._acks, timeout):
+                return self._acks.pop(command_id)
+        return None
+
+    def _recv_ack(self, command_id: int, timeout: float) -> Optional[int]:
+        """Read the ACK directly when the telemetry thread is not running."""
         start = time.time()
         while time.time() - start < timeout:
-            msg = self._mav.recv_match(type="COMMAND_ACK", blocking=True, timeout=1)
+            with self._recv_lock:
+                msg = self._mav.recv_match(type="COMMAND_ACK", blocking=True, timeout=1)
             if msg and msg.command == command_id:
-                if msg.result == mavutil.mavlink.MAV_RESULT_ACCEPTED:
-                    return True
-                else:
-                    logger.warning("Command %d rejected: result=%d", command_id, msg.result)
-                    return False
-        logger.warning("Timeout waiting for ACK on command %d", command_id)
-        return False
+                return msg.result
+        return None
 
     @staticmethod
     def _haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         """Distance between two GPS points in meters."""
         R = 6371000  # Earth radius in meters
         phi1, phi2 = math.radians(lat1), math.radians(lat2)
-        dphi = math.radians(lat2 - lat1)
-        dlam = math.radians(lon2 - lon1)
-        a = (
-            math.sin(dphi / 2) ** 2
-            + math.cos(phi1) * math.cos(phi2) * math.sin(dlam / 2) ** 2
-        )
-        return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+        sin_dphi = math.sin((phi2 - phi1) / 2)
+        sin_dlam = math.sin(math.radians(lon2 - lon1) / 2)
+        a = sin_dphi * sin_dphi + math.cos(phi1) * math.cos(phi2) * sin_dlam * sin_dlam
+        # 2·asin(√a) == 2·atan2(√a, √(1−a)), with one sqrt fewer
+        return R * 2 * math.asin(min(1.0, math.sqrt(a)))
 
     def disconnect(self) -> None:
         """Close MAVLink connection."""
+        self.stop_telemetry()
         if self._mav:
             self._mav.close()
             self._connected = False
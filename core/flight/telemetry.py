@@ -9,7 +9,8 @@ from __future__ import annotations
 
 import threading
 from dataclasses import dataclass, field
-from datetime import datetime, timezone
+
+from core.data.models import utc_now_iso
 
 
 @dataclass
@@ -46,9 +47,7 @@ class TelemetryState:
     last_heartbeat: str = ""
 
     # Timestamp of this snapshot
-    updated_at: str = field(
-        default_factory=lambda: datetime.now(timezone.utc).isoformat()
-    )
+    updated_at: str = field(default_factory=utc_now_iso)
 
 
 class TelemetryStore:
@@ -57,23 +56,33 @@ class TelemetryStore:
     def __init__(self):
         self._state = TelemetryState()
         self._lock = threading.Lock()
+        self._updated = threading.Condition(self._lock)
+        self._seq = 0
 
     def update(self, **kwargs) -> None:
         with self._lock:
             for key, value in kwargs.items():
                 if hasattr(self._state, key):
                     setattr(self._state, key, value)
-            self._state.updated_at = datetime.now(timezone.utc).isoformat()
+            self._state.updated_at = utc_now_iso()
+            self._seq += 1
+            self._updated.notify_all()
+
+    def wait_for_update(self, timeout: float) -> bool:
+        """Block until the next update() call. Returns False on timeout."""
+        with self._updated:
+            seq = self._seq
+            return self._updated.wait_for(lambda: self._seq != seq, timeout)
 
     @property
     def state(self) -> TelemetryState:
         """Return a snapshot of current telemetry."""
         with self._lock:
-            # Shallow copy is fine — all fields are primitives
-            return TelemetryState(**{
-                k: getattr(self._state, k)
-                for k in self._state.__dataclass_fields__
-            })
+            # Shallow copy is fine — all fields are primitives. Copying
+            # __dict__ skips __init__ and its keyword-argument parsing.
+            snapshot = TelemetryState.__new__(TelemetryState)
+            snapshot.__dict__.update(self._state.__dict__)
+            return snapshot
 
     @property
     def location(self) -> tuple[float, float, float]:
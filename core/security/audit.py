@@ -8,7 +8,11 @@ hash chain. Deleting or modifying entries breaks the chain.
 from __future__ import annotations
 
 import logging
-from typing import Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from typing import Iterator, Optional
 
 from core.data.models import AuditEntry
 from core.data.store import DataStore
@@ -16,6 +20,9 @@ from core.security.crypto import CryptoEngine
 
 logger = logging.getLogger(__name__)
 
+# Entries held by batch() before they are written early
+MAX_BATCH = 256
+
 
 class AuditLogger:
     """Append-only, tamper-evident audit log backed by SQLite."""
@@ -24,6 +31,9 @@ class AuditLogger:
         self._store = store
         self._crypto = crypto
         self._actor_id = actor_id
+        # Entries signed inside batch() but not yet written
+        self._pending: list[AuditEntry] = []
+        self._batch_depth = 0
 
     def log(self, action: str, details: Optional[dict] = None) -> AuditEntry:
         """Create a signed, hash-chained audit entry.
@@ -35,7 +45,10 @@ class AuditLogger:
         Returns:
             The created audit entry.
         """
-        prev_hash = self._store.get_last_audit_hash()
+        if self._pending:
+            prev_hash = self._pending[-1].content_hash()
+        else:
+            prev_hash = self._store.get_last_audit_hash()
 
         entry = AuditEntry(
             actor=self._actor_id,
@@ -48,17 +61,95 @@ class AuditLogger:
         signature = self._crypto.sign_data(entry.signable_payload())
         entry.signature = signature
 
-        self._store.append_audit(entry)
+        if self._batch_depth:
+            self._pending.append(entry)
+            if len(self._pending) >= MAX_BATCH:
+                self.flush()
+        else:
+            self._store.append_audit(entry)
         logger.debug("Audit: %s | %s | %s", entry.action, entry.actor, entry.id)
         return entry
 
-    def verify_chain(self) -> tuple[bool, int]:
-        """Verify the entire audit log hash chain.
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Write entries logged inside the block in a single transaction.
+
+        Entries are chained and signed as they are logged, then written
+        together when the (outermost) block exits, so the block costs
+        one commit instead of one per entry.
+        """
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self.flush()
+
+    def flush(self) -> None:
+        """Write any entries buffered by batch()."""
+        if self._pending:
+            entries, self._pending = self._pending, []
+            self._store.append_audit_batch(entries)
+
+    def verify_chain(self, incremental: bool = False) -> tuple[bool, int]:
+        """Verify the audit log hash chain.
+
+        With ``incremental=True`` only entries appended since the last
+        successful incremental verification are replayed, and a new
+        checkpoint is recorded.
 
         Returns (is_valid, entries_verified).
         """
-        return self._store.verify_audit_chain()
+        self.flush()
+        return self._store.verify_audit_chain(incremental=incremental)
+
+    def verify_signatures(
+        self, workers: int = 4, chunk_size: int = 256
+    ) -> tuple[bool, int]:
+        """Check every entry's Ed25519 signature against the drone key.
+
+        verify_chain() proves the entries link up; this proves they were
+        signed by this drone. Entries are verified in chunks on a thread
+        pool — the libsodium/OpenSSL calls release the GIL, so chunks run
+        on separate cores. At most ``2 * workers`` chunks are in flight,
+        so memory stays flat however long the log is.
+
+        Returns (all_valid, entries_checked). If invalid, entries_checked
+        is the position of the first entry with a bad signature.
+        """
+        self.flush()
+        verify_batch = self._crypto.verify_signatures_batch
+
+        def first_invalid(chunk: list[tuple[bytes, str]]) -> Optional[int]:
+            for i, ok in enumerate(verify_batch(chunk)):
+                if not ok:
+                    return i
+            return None
+
+        entries = (
+            (e.signable_payload(), e.signature)
+            for e in self._store.iter_audit_log(limit=None)
+        )
+        checked = 0
+        in_flight: deque = deque()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while True:
+                chunk = list(islice(entries, chunk_size))
+                if chunk:
+                    in_flight.append((len(chunk), pool.submit(first_invalid, chunk)))
+                if in_flight and (not chunk or len(in_flight) >= 2 * workers):
+                    size, future = in_flight.popleft()
+                    bad = future.result()
+                    if bad is not None:
+                        for _, f in in_flight:
+                            f.cancel()
+                        return False, checked + bad
+                    checked += size
+                elif not chunk:
+                    return True, checked
 
     def get_recent(self, limit: int = 50) -> list[AuditEntry]:
         """Get recent audit entries."""
+        self.flush()
         return self._store.get_audit_log(limit=limit)
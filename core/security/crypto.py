@@ -9,14 +9,57 @@ from __future__ import annotations
 import base64
 import hashlib
 import hmac
+import json
+import mmap
 import os
 import time
+from datetime import datetime, timezone
 from typing import Optional
 
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
 from core.security.identity import DroneIdentity
 
+# Prefix marking a Merkle batch signature produced by sign_batch()
+BATCH_SIG_PREFIX = "m1."
+
+# Read size for hash_file()
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Canonical command encoding: same output as json.dumps(sort_keys=True),
+# without building a new encoder on every call
+_canonical_json = json.JSONEncoder(sort_keys=True).encode
+
+
+def _leaf_hash(data: bytes) -> bytes:
+    return hashlib.sha256(b"\x00" + data).digest()
+
+
+def _node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+def _merkle_root(leaf: bytes, index: int, count: int, proof: list[bytes]) -> Optional[bytes]:
+    """Recompute a Merkle root from a leaf hash and its audit path.
+
+    Unpaired nodes are promoted to the next level unchanged, so the
+    proof only contains siblings that actually exist. Returns None if
+    the proof length does not match the tree shape.
+    """
+    node, pos, size = leaf, index, count
+    siblings = iter(proof)
+    while size > 1:
+        if pos ^ 1 < size:
+            sibling = next(siblings, None)
+            if sibling is None:
+                return None
+            node = _node_hash(sibling, node) if pos & 1 else _node_hash(node, sibling)
+        pos //= 2
+        size = (size + 1) // 2
+    if next(siblings, None) is not None:
+        return None
+    return node
+
 
 class CryptoEngine:
     """Cryptographic operations bound to a drone identity."""
@@ -26,17 +69,116 @@ class CryptoEngine:
 
     def sign_data(self, data: bytes) -> str:
         """Sign data and return base64-encoded signature."""
-        raw_sig = self._identity.sign(data)
-        return base64.b64encode(raw_sig).decode("ascii")
+        return base64.b64encode(self.sign_data_raw(data)).decode("ascii")
+
+    def sign_data_raw(self, data: bytes) -> bytes:
+        """Sign data and return the raw 64-byte Ed25519 signature.
+
+        For in-process use, where the base64 wire form is never needed.
+        """
+        return self._identity.sign(data)
+
+    def sign_batch(self, payloads: list[bytes]) -> list[str]:
+        """Sign several payloads with a single Ed25519 signature.
+
+        Builds a SHA-256 Merkle tree over the payloads and signs the root.
+        Each returned signature string is self-contained:
+        ``m1.<root_sig_b64>.<index>.<count>.<proof_b64>`` and is accepted
+        by verify_signature(). A single payload is signed directly and
+        gets a plain signature.
+        """
+        if len(payloads) <= 1:
+            return [self.sign_data(p) for p in payloads]
+
+        count = len(payloads)
+        level = [_leaf_hash(p) for p in payloads]
+        proofs: list[list[bytes]] = [[] for _ in payloads]
+        positions = list(range(count))
+        while len(level) > 1:
+            for leaf, pos in enumerate(positions):
+                if pos ^ 1 < len(level):
+                    proofs[leaf].append(level[pos ^ 1])
+                positions[leaf] = pos // 2
+            level = [
+                _node_hash(level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+                for i in range(0, len(level), 2)
+            ]
+
+        root_sig = self.sign_data(level[0])
+        return [
+            f"{BATCH_SIG_PREFIX}{root_sig}.{i}.{count}."
+            + base64.b64encode(b"".join(proofs[i])).decode("ascii")
+            for i in range(count)
+        ]
 
     def verify_signature(self, data: bytes, signature_b64: str) -> bool:
-        """Verify a base64-encoded signature."""
+        """Verify a base64-encoded signature.
+
+        Accepts both plain signatures and Merkle batch signatures from
+        sign_batch().
+        """
         try:
-            raw_sig = base64.b64decode(signature_b64)
-            return self._identity.verify(data, raw_sig)
+            signed = self._signed_message(data, signature_b64)
+            if signed is None:
+                return False
+            message, signature_b64 = signed
+            return self._identity.verify(message, base64.b64decode(signature_b64))
         except Exception:
             return False
 
+    def verify_signature_raw(self, data: bytes, signature: bytes) -> bool:
+        """Verify a raw 64-byte signature from sign_data_raw()."""
+        return self._identity.verify(data, signature)
+
+    def verify_signatures_batch(self, items: list[tuple[bytes, str]]) -> list[bool]:
+        """Verify many (data, signature_b64) pairs.
+
+        Findings signed together by sign_batch() share one Ed25519
+        signature over their Merkle root; it is checked once per distinct
+        root rather than once per finding, leaving only the SHA-256
+        audit path per item.
+        """
+        checked: dict[tuple[bytes, str], bool] = {}
+        results = []
+        for data, signature_b64 in items:
+            try:
+                signed = self._signed_message(data, signature_b64)
+                if signed is None:
+                    results.append(False)
+                    continue
+                ok = checked.get(signed)
+                if ok is None:
+                    ok = checked[signed] = self._identity.verify(
+                        signed[0], base64.b64decode(signed[1])
+                    )
+                results.append(ok)
+            except Exception:
+                results.append(False)
+        return results
+
+    @staticmethod
+    def _signed_message(data: bytes, signature_b64: str) -> Optional[tuple[bytes, str]]:
+        """The (message, signature_b64) pair the Ed25519 key actually signed.
+
+        For a plain signature that is the data itself; for a Merkle batch
+        signature it is the root recomputed from the audit path. Returns
+        None if the batch signature is malformed.
+        """
+        if not signature_b64.startswith(BATCH_SIG_PREFIX):
+            return data, signature_b64
+        root_sig, index, count, proof_b64 = (
+            signature_b64[len(BATCH_SIG_PREFIX):].split(".")
+        )
+        proof_raw = base64.b64decode(proof_b64)
+        proof = [proof_raw[i:i + 32] for i in range(0, len(proof_raw), 32)]
+        index, count = int(index), int(count)
+        if not 0 <= index < count:
+            return None
+        root = _merkle_root(_leaf_hash(data), index, count, proof)
+        if root is None:
+            return None
+        return root, root_sig
+
     def verify_command(
         self,
         payload: dict,
@@ -59,10 +201,11 @@ class CryptoEngine:
             return False, "invalid_operator"
 
         # Verify timestamp freshness
-        import json
         timestamp = payload.get("timestamp", "")
+        # Shortest accepted form is YYYY-MM-DDTHH:MM:SS
+        if not isinstance(timestamp, str) or len(timestamp) < 19:
+            return False, "invalid_timestamp"
         try:
-            from datetime import datetime, timezone
             cmd_time = datetime.fromisoformat(timestamp)
             now = datetime.now(timezone.utc)
             age = abs((now - cmd_time).total_seconds())
@@ -72,15 +215,23 @@ class CryptoEngine:
             return False, "invalid_timestamp"
 
         # Verify HMAC
-        payload_bytes = json.dumps(payload, sort_keys=True).encode()
-        expected = hmac.new(
-            api_key.encode(), payload_bytes, hashlib.sha256
-        ).hexdigest()
+        expected = self.command_hmac(payload, api_key)
         if not hmac.compare_digest(expected, provided_hmac):
             return False, "invalid_hmac"
 
         return True, "ok"
 
+    @staticmethod
+    def command_hmac(payload: dict, api_key: str) -> str:
+        """HMAC-SHA256 (hex) of a command payload, as checked by verify_command.
+
+        The payload is encoded as key-sorted JSON with the standard
+        separators; senders must produce the same bytes.
+        """
+        return hmac.new(
+            api_key.encode(), _canonical_json(payload).encode(), hashlib.sha256
+        ).hexdigest()
+
     @staticmethod
     def encrypt_data(plaintext: bytes, key: Optional[bytes] = None) -> tuple[bytes, bytes]:
         """Encrypt data with AES-256-GCM.
@@ -99,16 +250,36 @@ class CryptoEngine:
     @staticmethod
     def decrypt_data(ciphertext_with_nonce: bytes, key: bytes) -> bytes:
         """Decrypt AES-256-GCM encrypted data."""
-        nonce = ciphertext_with_nonce[:12]
-        ciphertext = ciphertext_with_nonce[12:]
-        aesgcm = AESGCM(key)
-        return aesgcm.decrypt(nonce, ciphertext, None)
+        data = memoryview(ciphertext_with_nonce)
+        return AESGCM(key).decrypt(data[:12], data[12:], None)
 
     @staticmethod
     def hash_file(file_path: str) -> str:
-        """SHA-256 hash of a file."""
-        h = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(8192), b""):
-                h.update(chunk)
-        return h.hexdigest()
+        """SHA-256 hash of a file.
+
+        Files of at least HASH_CHUNK_SIZE are memory-mapped and hashed in
+        a single update(), so the whole digest runs in C without a Python
+        round trip per block. Smaller files, and sources that can't be
+        mapped (pipes, some special files), are read into one reused
+        buffer instead.
+        """
+        with open(file_path, "rb", buffering=0) as f:
+            try:
+                size = os.fstat(f.fileno()).st_size
+                if size >= HASH_CHUNK_SIZE:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        if hasattr(mm, "madvise"):
+                            mm.madvise(mmap.MADV_SEQUENTIAL)
+                        return hashlib.sha256(mm).hexdigest()
+            except (OSError, ValueError):
+                f.seek(0)
+
+            h = hashlib.sha256()
+            buf = bytearray(HASH_CHUNK_SIZE)
+            view = memoryview(buf)
+            while True:
+                n = f.readinto(buf)
+                if not n:
+                    break
+                h.update(view[:n])
+            return h.hexdigest()
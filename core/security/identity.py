@@ -11,9 +11,11 @@ and MAC address, making it non-transferable between devices.
 from __future__ import annotations
 
 import hashlib
+import hmac
 import json
 import os
 import uuid
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
@@ -23,8 +25,43 @@ from cryptography.hazmat.primitives.asymmetric.ed25519 import (
 )
 from cryptography.hazmat.primitives import serialization
 
+try:
+    import pysodium
+except (ImportError, OSError, ValueError):  # optional; needs libsodium
+    pysodium = None
+
 from core.data.models import uuid7
 
+def _write_file(path: Path, data: bytes, mode: int = 0o644) -> None:
+    """Write a whole file, created with the given permission bits."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def _sync() -> None:
+    """Flush all pending file writes to storage with a single call."""
+    if hasattr(os, "sync"):
+        os.sync()
+
+
+def _fsync_dir(path: Path) -> None:
+    """Persist a directory entry change (e.g. a rename) on POSIX."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
 
 class DroneIdentity:
     """Manages drone identity: keypair, hardware binding, operator keys."""
@@ -34,6 +71,8 @@ class DroneIdentity:
         self._drone_id: Optional[str] = None
         self._private_key: Optional[Ed25519PrivateKey] = None
         self._public_key: Optional[Ed25519PublicKey] = None
+        self._sodium_sk: Optional[bytes] = None  # libsodium secret key, if available
+        self._sodium_pk: Optional[bytes] = None  # libsodium public key, if available
         self._hardware_fingerprint: Optional[str] = None
         self._operator_keys: dict[str, str] = {}  # user_id -> api_key_hash
 
@@ -55,47 +94,53 @@ class DroneIdentity:
 
         Generates keypair, computes hardware fingerprint, stores everything.
         Returns public identity info for registering with ground station.
-        """
-        self._dir.mkdir(parents=True, exist_ok=True)
 
+        Each file is written next to its final name, all of them are
+        flushed with one sync, and each is then renamed into place, so no
+        file is ever seen half-written. drone_id goes last: a directory
+        only looks provisioned once every other file is in place. Other
+        files in the directory are left alone.
+        """
         # Generate identity
         self._drone_id = uuid7()
         self._private_key = Ed25519PrivateKey.generate()
         self._public_key = self._private_key.public_key()
+        self._init_sodium_key()
         self._hardware_fingerprint = self._compute_hardware_fingerprint()
 
-        # Save drone ID
-        (self._dir / "drone_id").write_text(self._drone_id)
-
-        # Save private key (owner-only permissions)
         key_pem = self._private_key.private_bytes(
             encoding=serialization.Encoding.PEM,
             format=serialization.PrivateFormat.PKCS8,
             encryption_algorithm=serialization.NoEncryption(),
         )
-        key_path = self._dir / "drone_key.pem"
-        key_path.write_bytes(key_pem)
-        os.chmod(key_path, 0o600)
-
-        # Save public key
         pub_pem = self._public_key.public_bytes(
             encoding=serialization.Encoding.PEM,
             format=serialization.PublicFormat.SubjectPublicKeyInfo,
         )
-        (self._dir / "drone_key_pub.pem").write_bytes(pub_pem)
-
-        # Save hardware fingerprint
-        (self._dir / "hardware_fingerprint").write_text(self._hardware_fingerprint)
-
-        # Save org binding
-        (self._dir / "org_id").write_text(org_id)
 
         # Generate initial operator API key
         operator_id = uuid7()
         api_key = os.urandom(32).hex()
         api_key_hash = hashlib.sha256(api_key.encode()).hexdigest()
         self._operator_keys[operator_id] = api_key_hash
-        self._save_operator_keys()
+
+        self._dir.mkdir(parents=True, exist_ok=True)
+        # (name, contents, mode) in the order they are moved into place
+        files = [
+            # Private key and operator hashes are owner-only from creation
+            ("drone_key.pem", key_pem, 0o600),
+            ("drone_key_pub.pem", pub_pem, 0o644),
+            ("hardware_fingerprint", self._hardware_fingerprint.encode(), 0o644),
+            ("org_id", org_id.encode(), 0o644),
+            ("operators.json", json.dumps(self._operator_keys, indent=2).encode(), 0o600),
+            ("drone_id", self._drone_id.encode(), 0o644),
+        ]
+        for name, data, mode in files:
+            _write_file(self._dir / f"{name}.tmp", data, mode)
+        _sync()
+        for name, _, _ in files:
+            os.replace(self._dir / f"{name}.tmp", self._dir / name)
+        _fsync_dir(self._dir)
 
         return {
             "drone_id": self._drone_id,
@@ -113,6 +158,7 @@ class DroneIdentity:
         key_pem = (self._dir / "drone_key.pem").read_bytes()
         self._private_key = serialization.load_pem_private_key(key_pem, password=None)
         self._public_key = self._private_key.public_key()
+        self._init_sodium_key()
 
         fp_path = self._dir / "hardware_fingerprint"
         if fp_path.exists():
@@ -122,10 +168,28 @@ class DroneIdentity:
         if ops_path.exists():
             self._operator_keys = json.loads(ops_path.read_text())
 
+    def _init_sodium_key(self) -> None:
+        """Expand the Ed25519 seed into a libsodium keypair.
+
+        libsodium's hand-tuned Curve25519 code signs and verifies faster
+        than OpenSSL on older Jetson builds. Ed25519 is deterministic, so
+        signatures are byte-identical whichever backend produces them.
+        """
+        if pysodium is None:
+            return
+        seed = self._private_key.private_bytes(
+            encoding=serialization.Encoding.Raw,
+            format=serialization.PrivateFormat.Raw,
+            encryption_algorithm=serialization.NoEncryption(),
+        )
+        self._sodium_pk, self._sodium_sk = pysodium.crypto_sign_seed_keypair(seed)
+
     def sign(self, data: bytes) -> bytes:
         """Sign data with the drone's private key."""
         if not self._private_key:
             raise RuntimeError("Drone not provisioned.")
+        if self._sodium_sk is not None:
+            return pysodium.crypto_sign_detached(data, self._sodium_sk)
         return self._private_key.sign(data)
 
     def verify(self, data: bytes, signature: bytes) -> bool:
@@ -133,6 +197,9 @@ class DroneIdentity:
         if not self._public_key:
             raise RuntimeError("Drone not provisioned.")
         try:
+            if self._sodium_pk is not None:
+                pysodium.crypto_sign_verify_detached(signature, data, self._sodium_pk)
+                return True
             self._public_key.verify(signature, data)
             return True
         except Exception:
@@ -144,7 +211,7 @@ class DroneIdentity:
         if not expected_hash:
             return False
         provided_hash = hashlib.sha256(api_key.encode()).hexdigest()
-        return provided_hash == expected_hash
+        return hmac.compare_digest(provided_hash, expected_hash)
 
     def add_operator(self, operator_id: str, api_key: str) -> None:
         """Register a new operator API key."""
@@ -158,11 +225,14 @@ class DroneIdentity:
         os.chmod(ops_path, 0o600)
 
     @staticmethod
+    @lru_cache(maxsize=1)
     def _compute_hardware_fingerprint() -> str:
         """Derive a hardware fingerprint from CPU serial + MAC address.
 
         On Jetson, reads /proc/device-tree/serial-number.
         Falls back to a UUID-based fingerprint for dev/testing.
+        The hardware doesn't change under a running process, so the
+        result is computed once.
         """
         parts = []
 
@@ -1,4 +1,4 @@
 from core.vision.camera import Camera
-from core.vision.detector import Detector, Detection
+from core.vision.detector import Detector, Detection, Detections
 
-__all__ = ["Camera", "Detector", "Detection"]
+__all__ = ["Camera", "Detector", "Detection", "Detections"]
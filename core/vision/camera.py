@@ -21,13 +21,16 @@ import numpy as np
 
 logger = logging.getLogger(__name__)
 
-# GStreamer pipeline for Jetson CSI camera (IMX219/IMX477)
+# GStreamer pipeline for Jetson CSI camera (IMX219/IMX477). The appsink
+# keeps only the newest frame: the capture thread always wants the latest
+# image, and a backlog would add latency plus a host copy per stale frame.
 JETSON_CSI_PIPELINE = (
     "nvarguscamerasrc ! "
     "video/x-raw(memory:NVMM),width={width},height={height},"
     "framerate={fps}/1 ! "
     "nvvidconv ! video/x-raw,format=BGRx ! "
-    "videoconvert ! video/x-raw,format=BGR ! appsink"
+    "videoconvert ! video/x-raw,format=BGR ! "
+    "appsink drop=true max-buffers=1 sync=false"
 )
 
 
@@ -58,8 +61,11 @@ class Camera:
         self._frame: Optional[np.ndarray] = None
         self._frame_id: int = 0
         self._lock = threading.Lock()
+        self._frame_ready = threading.Condition(self._lock)
         self._running = False
         self._thread: Optional[threading.Thread] = None
+        # Live sources block in read() until the next frame; files don't
+        self._live = False
 
     @property
     def is_open(self) -> bool:
@@ -84,6 +90,7 @@ class Camera:
         else:
             pipeline = None
 
+        self._live = pipeline is not None or isinstance(source, int)
         if pipeline:
             self._cap = cv2.VideoCapture(pipeline, cv2.CAP_GSTREAMER)
         elif isinstance(source, int):
@@ -133,24 +140,57 @@ class Camera:
     def read(self) -> tuple[bool, Optional[np.ndarray], int]:
         """Get the latest frame.
 
+        The capture thread never writes to a frame once it is published,
+        so the frame is returned without copying. It is read-only;
+        callers that need to draw on it must ``.copy()`` it first.
+
         Returns:
             (success, frame, frame_id). Frame is None if no frame available.
         """
         with self._lock:
             if self._frame is None:
                 return False, None, 0
-            return True, self._frame.copy(), self._frame_id
+            return True, self._frame, self._frame_id
+
+    def wait_for_frame(self, last_frame_id: int, timeout: float) -> bool:
+        """Block until a frame newer than last_frame_id is captured.
+
+        Returns True if a new frame is available, False on timeout.
+        """
+        with self._frame_ready:
+            return self._frame_ready.wait_for(
+                lambda: self._frame_id != last_frame_id, timeout
+            )
 
     def _capture_loop(self) -> None:
-        """Background thread: continuously reads frames."""
+        """Background thread: continuously reads frames.
+
+        Live cameras are read back to back: read() blocks until the
+        driver (or the GStreamer appsink) has a new frame, so frames are
+        picked up as soon as they arrive. Video files return immediately
+        and are paced to the configured fps.
+        """
         frame_interval = 1.0 / self._fps
+        next_frame = time.monotonic()
         while self._running and self._cap and self._cap.isOpened():
             ret, frame = self._cap.read()
             if ret:
-                with self._lock:
+                # read() allocates a fresh array each time; freeze it so
+                # the frame can be shared with readers without a copy
+                frame.flags.writeable = False
+                with self._frame_ready:
                     self._frame = frame
                     self._frame_id += 1
+                    self._frame_ready.notify_all()
             else:
                 logger.warning("Frame capture failed, retrying...")
                 time.sleep(0.1)
-            time.sleep(frame_interval * 0.5)  # slight sleep to prevent CPU spin
+                next_frame = time.monotonic()
+                continue
+            if not self._live:
+                next_frame += frame_interval
+                delay = next_frame - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_frame = time.monotonic()
@@ -12,10 +12,14 @@ apps layer doesn't care what's doing the inference.
 from __future__ import annotations
 
 import logging
+import queue
+import shutil
+import threading
 import time
-from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional, Union
 
 import cv2
 import numpy as np
@@ -39,6 +43,29 @@ COCO_CLASSES = [
     "scissors", "teddy bear", "hair drier", "toothbrush",
 ]
 
+COCO_CLASS_TO_ID = {name: i for i, name in enumerate(COCO_CLASSES)}
+
+# Box/label colours (BGR) for annotate_frame, by class id
+_BOX_COLORS = {COCO_CLASS_TO_ID["person"]: (0, 0, 255)}
+_DEFAULT_BOX_COLOR = (0, 255, 0)
+
+# Largest batch the exported TensorRT engine accepts
+MAX_BATCH = 8
+
+
+def _class_name(class_id: int) -> str:
+    """Display name for a class id; ids past the COCO table are 'class_<id>'."""
+    return COCO_CLASSES[class_id] if 0 <= class_id < len(COCO_CLASSES) else f"class_{class_id}"
+
+
+def _class_id(name: str) -> Optional[int]:
+    """Inverse of _class_name(), or None for a name no model id maps to."""
+    if name in COCO_CLASS_TO_ID:
+        return COCO_CLASS_TO_ID[name]
+    if name.startswith("class_") and name[6:].isdigit():
+        return int(name[6:])
+    return None
+
 
 @dataclass
 class Detection:
@@ -61,6 +88,66 @@ class Detection:
         return (self.x2 - self.x1) * (self.y2 - self.y1)
 
 
+def _empty_boxes() -> np.ndarray:
+    return np.empty((0, 4), dtype=np.int32)
+
+
+def _empty_ids() -> np.ndarray:
+    return np.empty(0, dtype=np.int32)
+
+
+def _empty_confs() -> np.ndarray:
+    return np.empty(0, dtype=np.float32)
+
+
+@dataclass(eq=False)
+class Detections:
+    """All detections in one frame, stored as parallel arrays.
+
+    Boxes, class ids and confidences stay in NumPy arrays so filtering,
+    NMS and box arithmetic don't allocate an object per detection.
+    Indexing with an int, or iterating, yields Detection views; indexing
+    with a slice, mask or index array yields a smaller Detections.
+    """
+
+    xyxy: np.ndarray = field(default_factory=_empty_boxes)  # (N, 4) int32
+    class_ids: np.ndarray = field(default_factory=_empty_ids)  # (N,) int32
+    confs: np.ndarray = field(default_factory=_empty_confs)  # (N,) float32
+
+    @classmethod
+    def from_list(cls, detections: list[Detection]) -> Detections:
+        if not detections:
+            return cls()
+        return cls(
+            xyxy=np.array([[d.x1, d.y1, d.x2, d.y2] for d in detections], dtype=np.int32),
+            class_ids=np.array([d.class_id for d in detections], dtype=np.int32),
+            confs=np.array([d.confidence for d in detections], dtype=np.float32),
+        )
+
+    @property
+    def class_names(self) -> list[str]:
+        return [_class_name(c) for c in self.class_ids.tolist()]
+
+    def __len__(self) -> int:
+        return len(self.class_ids)
+
+    def __getitem__(self, index) -> Union[Detection, Detections]:
+        if isinstance(index, (int, np.integer)):
+            x1, y1, x2, y2 = self.xyxy[index].tolist()
+            cls_id = int(self.class_ids[index])
+            return Detection(
+                class_name=_class_name(cls_id),
+                class_id=cls_id,
+                confidence=float(self.confs[index]),
+                x1=x1, y1=y1, x2=x2, y2=y2,
+            )
+        return Detections(self.xyxy[index], self.class_ids[index], self.confs[index])
+
+    def __iter__(self) -> Iterator[Detection]:
+        for i in range(len(self)):
+            yield self[i]
+
+
 class Detector:
     """YOLOv8 object detector with Jetson TensorRT acceleration."""
 
@@ -70,6 +157,7 @@ class Detector:
         confidence_threshold: float = 0.5,
         target_classes: Optional[list[str]] = None,
         device: str = "auto",
+        engine_cache_dir: Optional[str] = None,
     ):
         """Initialize detector.
 
@@ -78,20 +166,38 @@ class Detector:
             confidence_threshold: Minimum confidence for detections.
             target_classes: Only return these classes. None = all classes.
             device: 'auto', 'cuda', 'cpu'. Auto detects Jetson GPU.
+            engine_cache_dir: On CUDA, export .pt models to an FP16
+                TensorRT engine once and keep it here for later boots.
+                None disables the export.
         """
         self._model_name = model_name
         self._conf_threshold = confidence_threshold
-        self._target_classes = set(target_classes) if target_classes else None
+        # Class-id lookup table for the target filter. The trailing slot
+        # is always False, so clipped out-of-range ids are rejected.
+        self._target_mask: Optional[np.ndarray] = None
+        if target_classes:
+            ids = [i for i in map(_class_id, target_classes) if i is not None]
+            self._target_mask = np.zeros(max([len(COCO_CLASSES), *ids]) + 2, dtype=bool)
+            self._target_mask[ids] = True
         self._device = device
+        self._engine_cache_dir = engine_cache_dir
         self._model = None
         self._backend = "none"
         self._inference_ms: float = 0.0
+        self._inference_ms_per_frame: float = 0.0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._closed = False
 
     @property
     def inference_ms(self) -> float:
         """Last inference time in milliseconds."""
         return self._inference_ms
 
+    @property
+    def inference_ms_per_frame(self) -> float:
+        """Last inference time divided by the number of frames it covered."""
+        return self._inference_ms_per_frame
+
     @property
     def backend(self) -> str:
         return self._backend
@@ -135,6 +241,12 @@ class Detector:
                 except ImportError:
                     self._device = "cpu"
 
+            if self._device == "cuda" and self._engine_cache_dir:
+                engine_path = self._tensorrt_engine(model_path)
+                if engine_path:
+                    self._model = YOLO(engine_path, task="detect")
+                    model_path = engine_path
+
             self._backend = "ultralytics"
             logger.info("Loaded YOLOv8 model via ultralytics: %s", model_path)
             return True
@@ -145,6 +257,48 @@ class Detector:
             logger.warning("Failed to load ultralytics model: %s", e)
             return False
 
+    def _tensorrt_engine(self, model_path: str) -> Optional[str]:
+        """Path to an FP16 TensorRT engine for the loaded .pt model.
+
+        Engines are cached by the SHA-256 of the weights, so a changed
+        model is re-exported and an unchanged one is reused on every
+        later boot instead of being rebuilt. Returns None if the model
+        is not a .pt file or the export fails.
+        """
+        from core.security.crypto import CryptoEngine
+
+        weights = Path(getattr(self._model, "ckpt_path", None) or model_path)
+        if weights.suffix != ".pt" or not weights.exists():
+            return None
+        cache_dir = Path(self._engine_cache_dir).expanduser()
+        digest = CryptoEngine.hash_file(str(weights))[:16]
+        engine = cache_dir / f"{weights.stem}-{digest}-fp16-b{MAX_BATCH}.engine"
+        if engine.exists():
+            return str(engine)
+
+        logger.info("Exporting %s to TensorRT (FP16), this takes a few minutes", weights)
+        try:
+            exported = self._model.export(
+                format="engine", half=True, imgsz=640,
+                dynamic=True, batch=MAX_BATCH, device=0,
+            )
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(exported), engine)
+        except Exception as e:
+            logger.warning("TensorRT export failed, using PyTorch model: %s", e)
+            return None
+        return str(engine)
+
+    def warmup(self) -> None:
+        """Run one inference on a blank frame.
+
+        The first call pays for CUDA context set-up, kernel selection and
+        memory allocation; doing it before the mission keeps that latency
+        out of the first real frame.
+        """
+        if self._model is not None:
+            self.detect(np.zeros((640, 640, 3), dtype=np.uint8))
+
     def _try_load_opencv_dnn(self) -> bool:
         try:
             model_path = self._model_name
@@ -174,122 +328,263 @@ class Detector:
             logger.warning("Failed to load OpenCV DNN model: %s", e)
             return False
 
-    def detect(self, frame: np.ndarray) -> list[Detection]:
+    def detect(self, frame: np.ndarray) -> Detections:
         """Run detection on a single frame.
 
         Args:
             frame: BGR image (OpenCV format).
 
         Returns:
-            List of Detection objects that pass confidence and class filters.
+            Detections that pass confidence and class filters.
+        """
+        return self.detect_batch([frame])[0]
+
+    def detect_batch(self, frames: list[np.ndarray]) -> list[Detections]:
+        """Run detection on several frames with a single model call.
+
+        GPU inference is dominated by per-call overhead at batch size 1,
+        so batching frames from several cameras (or a short burst from
+        one) raises throughput considerably.
+
+        Args:
+            frames: BGR images (OpenCV format), at most MAX_BATCH.
+
+        Returns:
+            One Detections per input frame, in input order.
         """
-        if self._model is None:
-            return []
+        if self._model is None or not frames:
+            return [Detections() for _ in frames]
 
         start = time.perf_counter()
 
         if self._backend == "ultralytics":
-            detections = self._detect_ultralytics(frame)
+            batches = self._detect_ultralytics(frames)
         elif self._backend == "opencv_dnn":
-            detections = self._detect_opencv(frame)
+            batches = self._detect_opencv(frames)
         else:
-            detections = []
+            batches = [Detections() for _ in frames]
 
         self._inference_ms = (time.perf_counter() - start) * 1000
+        self._inference_ms_per_frame = self._inference_ms / len(frames)
 
         # Filter by target classes
-        if self._target_classes:
-            detections = [d for d in detections if d.class_name in self._target_classes]
+        if self._target_mask is not None:
+            batches = [
+                detections[self._target_mask.take(detections.class_ids, mode="clip")]
+                for detections in batches
+            ]
+
+        return batches
+
+    def detect_async(self, frame: np.ndarray) -> Future:
+        """Run detect() on a background inference thread.
 
-        return detections
+        Lets the caller capture the next frame and handle the previous
+        frame's results while inference runs (ultralytics/torch and
+        OpenCV DNN release the GIL during inference). Requests are
+        processed in submission order.
 
-    def _detect_ultralytics(self, frame: np.ndarray) -> list[Detection]:
-        results = self._model(frame, conf=self._conf_threshold, verbose=False)
-        detections = []
+        Returns:
+            Future resolving to the frame's Detections.
+
+        Raises:
+            RuntimeError: If close() has already been called.
+        """
+        if self._closed:
+            raise RuntimeError("Detector is closed")
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="detector"
+            )
+        return self._executor.submit(self.detect, frame)
+
+    def close(self) -> None:
+        """Stop the background inference thread, if started.
+
+        Idempotent. Synchronous detect() keeps working afterwards, but
+        detect_async() refuses new work rather than starting a new thread.
+        """
+        self._closed = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _detect_ultralytics(self, frames: list[np.ndarray]) -> list[Detections]:
+        results = self._model(frames, conf=self._conf_threshold, verbose=False)
+        batches = []
         for result in results:
             if result.boxes is None:
+                batches.append(Detections())
                 continue
-            for box in result.boxes:
-                cls_id = int(box.cls[0])
-                conf = float(box.conf[0])
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
-                class_name = COCO_CLASSES[cls_id] if cls_id < len(COCO_CLASSES) else f"class_{cls_id}"
-                detections.append(Detection(
-                    class_name=class_name,
-                    class_id=cls_id,
-                    confidence=conf,
-                    x1=x1, y1=y1, x2=x2, y2=y2,
-                ))
-        return detections
-
-    def _detect_opencv(self, frame: np.ndarray) -> list[Detection]:
-        blob = cv2.dnn.blobFromImage(
-            frame, 1 / 255.0, (640, 640), swapRB=True, crop=False
+            boxes = result.boxes.cpu().numpy()
+            batches.append(Detections(
+                xyxy=boxes.xyxy.astype(np.int32),
+                class_ids=boxes.cls.astype(np.int32),
+                confs=boxes.conf.astype(np.float32),
+            ))
+        return batches
+
+    def _detect_opencv(self, frames: list[np.ndarray]) -> list[Detections]:
+        blob = cv2.dnn.blobFromImages(
+            frames, 1 / 255.0, (640, 640), swapRB=True, crop=False
         )
         self._model.setInput(blob)
         outputs = self._model.forward()
 
-        detections = []
-        h, w = frame.shape[:2]
-
-        # YOLOv8 output shape: (1, 84, 8400) -> transpose to (8400, 84)
+        # YOLOv8 output shape: (B, 84, 8400) -> per frame (8400, 84)
         if len(outputs.shape) == 3:
-            outputs = outputs[0].T
-
-        for row in outputs:
-            scores = row[4:]
-            cls_id = int(np.argmax(scores))
-            conf = float(scores[cls_id])
-            if conf < self._conf_threshold:
-                continue
-
-            cx, cy, bw, bh = row[0], row[1], row[2], row[3]
-            x1 = int((cx - bw / 2) * w / 640)
-            y1 = int((cy - bh / 2) * h / 640)
-            x2 = int((cx + bw / 2) * w / 640)
-            y2 = int((cy + bh / 2) * h / 640)
-
-            class_name = COCO_CLASSES[cls_id] if cls_id < len(COCO_CLASSES) else f"class_{cls_id}"
-            detections.append(Detection(
-                class_name=class_name,
-                class_id=cls_id,
-                confidence=conf,
-                x1=max(0, x1), y1=max(0, y1),
-                x2=min(w, x2), y2=min(h, y2),
-            ))
-
-        # NMS
-        if detections:
-            boxes = [[d.x1, d.y1, d.x2 - d.x1, d.y2 - d.y1] for d in detections]
-            confs = [d.confidence for d in detections]
-            indices = cv2.dnn.NMSBoxes(boxes, confs, self._conf_threshold, 0.45)
-            if len(indices) > 0:
-                detections = [detections[i] for i in indices.flatten()]
-            else:
-                detections = []
+            return [
+                self._decode_opencv(output.T, frame)
+                for output, frame in zip(outputs, frames)
+            ]
+        # 2-D output: the network has no batch axis, so run frames one at a time
+        if len(frames) > 1:
+            return [self._detect_opencv([frame])[0] for frame in frames]
+        return [self._decode_opencv(outputs, frames[0])]
+
+    def _decode_opencv(self, outputs: np.ndarray, frame: np.ndarray) -> Detections:
+        h, w = frame.shape[:2]
 
-        return detections
+        # Best class per candidate row, then drop rows below threshold
+        scores = outputs[:, 4:]
+        cls_ids = scores.argmax(axis=1)
+        confs = scores[np.arange(len(scores)), cls_ids]
+        keep = confs >= self._conf_threshold
+        if not keep.any():
+            return Detections()
+        cls_ids, confs = cls_ids[keep], confs[keep]
+
+        cx, cy, bw, bh = outputs[keep, :4].T
+        x1 = np.maximum(((cx - bw / 2) * w / 640).astype(np.int32), 0)
+        y1 = np.maximum(((cy - bh / 2) * h / 640).astype(np.int32), 0)
+        x2 = np.minimum(((cx + bw / 2) * w / 640).astype(np.int32), w)
+        y2 = np.minimum(((cy + bh / 2) * h / 640).astype(np.int32), h)
+
+        # NMS on the candidate arrays
+        boxes = np.stack((x1, y1, x2 - x1, y2 - y1), axis=1)
+        indices = cv2.dnn.NMSBoxes(boxes, confs, self._conf_threshold, 0.45)
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+        return Detections(
+            xyxy=np.stack((x1, y1, x2, y2), axis=1)[indices],
+            class_ids=cls_ids[indices].astype(np.int32),
+            confs=confs[indices].astype(np.float32),
+        )
 
-    def annotate_frame(self, frame: np.ndarray, detections: list[Detection]) -> np.ndarray:
+    def annotate_frame(
+        self,
+        frame: np.ndarray,
+        detections: Detections,
+        inplace: bool = False,
+    ) -> np.ndarray:
         """Draw bounding boxes and labels on a frame.
 
-        Returns a copy with annotations. Original frame is not modified.
+        Returns a copy with annotations; the original frame is not
+        modified unless ``inplace`` is set, which draws straight onto
+        ``frame`` (it must be writeable) and skips the full-frame copy.
         """
-        annotated = frame.copy()
-        for det in detections:
-            color = (0, 0, 255) if det.class_name == "person" else (0, 255, 0)
-            cv2.rectangle(annotated, (det.x1, det.y1), (det.x2, det.y2), color, 2)
-            label = f"{det.class_name} {det.confidence:.2f}"
+        annotated = frame if inplace else frame.copy()
+        for (x1, y1, x2, y2), cls_id, conf in zip(
+            detections.xyxy.tolist(),
+            detections.class_ids.tolist(),
+            detections.confs.tolist(),
+        ):
+            color = _BOX_COLORS.get(cls_id, _DEFAULT_BOX_COLOR)
+            cv2.rectangle(annotated, (x1, y1), (x2, y2), color, 2)
+            label = f"{_class_name(cls_id)} {conf:.2f}"
             (tw, th), _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 1)
             cv2.rectangle(
                 annotated,
-                (det.x1, det.y1 - th - 8),
-                (det.x1 + tw, det.y1),
+                (x1, y1 - th - 8),
+                (x1 + tw, y1),
                 color, -1,
             )
             cv2.putText(
                 annotated, label,
-                (det.x1, det.y1 - 4),
+                (x1, y1 - 4),
                 cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1,
             )
         return annotated
+
+
+class BatchingDetector:
+    """Coalesces frames from several producers into batched inference.
+
+    Each ``submit()`` returns a Future immediately. A worker thread waits
+    for the first queued frame, then collects more until it has
+    ``max_batch`` frames or ``max_wait_ms`` has passed, and runs them
+    through ``Detector.detect_batch`` in one call. Useful with several
+    cameras feeding one GPU; a single pipelined stream is better served
+    by ``Detector.detect_async``.
+    """
+
+    def __init__(
+        self,
+        detector: Detector,
+        max_batch: int = MAX_BATCH,
+        max_wait_ms: float = 5.0,
+    ):
+        self._detector = detector
+        self._max_batch = max(1, min(max_batch, MAX_BATCH))
+        self._max_wait = max_wait_ms / 1000
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, name="detector-batch", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def inference_ms_per_frame(self) -> float:
+        return self._detector.inference_ms_per_frame
+
+    def submit(self, frame: np.ndarray) -> Future:
+        """Queue a frame for detection.
+
+        Returns:
+            Future resolving to the frame's Detections.
+        """
+        future: Future = Future()
+        self._queue.put((frame, future))
+        return future
+
+    def close(self) -> None:
+        """Finish queued frames and stop the worker thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + self._max_wait
+            while len(batch) < self._max_batch:
+                timeout = max(0.0, deadline - time.monotonic())
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._dispatch(batch)
+            if stop:
+                return
+
+    def _dispatch(self, batch: list) -> None:
+        frames = [frame for frame, _ in batch]
+        try:
+            results = self._detector.detect_batch(frames)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), detections in zip(batch, results):
+            future.set_result(detections)
+        # Never leave a caller waiting on a frame the backend dropped
+        for _, future in batch[len(results):]:
+            future.set_exception(RuntimeError(
+                f"Detector returned {len(results)} results for {len(batch)} frames"
+            ))
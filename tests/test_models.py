@@ -2,11 +2,15 @@
 
 import json
 import sys
+from dataclasses import fields
+from datetime import datetime, timezone
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from core.data.models import uuid7, Mission, MissionStatus, Finding, AuditEntry
+from core.data.models import (
+    uuid7, utc_now_iso, format_utc, Mission, MissionStatus, Finding, AuditEntry,
+)
 
 
 def test_uuid7_format():
@@ -21,6 +25,21 @@ def test_uuid7_sortable():
     assert ids == sorted(ids)
 
 
+def test_utc_now_iso():
+    before = datetime.now(timezone.utc)
+    ts = utc_now_iso()
+    after = datetime.now(timezone.utc)
+    assert len(ts) == 32  # microseconds always present
+    assert before <= datetime.fromisoformat(ts) <= after
+
+
+def test_format_utc():
+    dt = datetime(2024, 3, 9, 7, 5, 2, 4031, tzinfo=timezone.utc)
+    s = int(dt.timestamp())
+    assert format_utc(s, 4031) == "2024-03-09T07:05:02.004031+00:00"
+    assert format_utc(s, 4031, "%Y%m%d_%H%M%S_%f") == dt.strftime("%Y%m%d_%H%M%S_%f")
+
+
 def test_mission_serialization():
     mission = Mission(
         created_by="test-operator",
@@ -37,6 +56,13 @@ def test_mission_serialization():
     assert restored.waypoints == mission.waypoints
 
 
+def test_to_dict_covers_every_field():
+    for obj in (Mission(), Finding(), AuditEntry()):
+        public = {f.name for f in fields(obj) if not f.name.startswith("_")}
+        assert set(obj.to_dict()) == public
+        assert type(obj).from_dict(obj.to_dict()) == obj
+
+
 def test_mission_json_roundtrip():
     mission = Mission(created_by="test")
     json_str = mission.to_json()
@@ -61,6 +87,10 @@ def test_finding_signable_payload():
     assert b"abc123" in payload
     # Same finding should produce same payload
     assert payload == f.signable_payload()
+    # Changing a signed field changes the payload
+    f.confidence = 0.5
+    assert payload != f.signable_payload()
+    assert "_signable_cache" not in f.to_dict()
 
 
 def test_finding_hash_image():
@@ -69,6 +99,8 @@ def test_finding_hash_image():
     assert len(h) == 64  # SHA-256 hex
     # Same bytes, same hash
     assert h == Finding.hash_image(image_bytes)
+    # Buffer-protocol objects hash identically without a copy
+    assert h == Finding.hash_image(memoryview(image_bytes))
 
 
 def test_audit_entry_hash_chain():
@@ -107,3 +139,11 @@ def test_audit_entry_tamper_detection():
     # Tamper with details
     e.details = {"x": 2}
     assert e.content_hash() != original_hash
+
+    # Re-signing changes the hash but not the signed payload
+    payload = e.signable_payload()
+    tampered_hash = e.content_hash()
+    e.signature = "sig2"
+    assert e.signable_payload() == payload
+    assert e.content_hash() != tampered_hash
+    assert "_hash_cache" not in e.to_dict()
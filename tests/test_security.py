@@ -1,19 +1,23 @@
 """Tests for security layer — identity, signing, verification."""
 
+import hashlib
+import hmac
+import json
 import os
 import sys
-import tempfile
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from core.security.identity import DroneIdentity
 from core.security.crypto import CryptoEngine
-from core.data.models import Finding
+from core.security.audit import AuditLogger
+from core.data.models import Finding, utc_now_iso
+from core.data.store import DataStore
 
 
-def test_provision_creates_identity():
-    tmp_dir = tempfile.mkdtemp(prefix="test_identity_")
+def test_provision_creates_identity(tmp_path):
+    tmp_dir = str(tmp_path / "identity")
     identity = DroneIdentity(identity_dir=tmp_dir)
     assert not identity.is_provisioned
 
@@ -33,9 +37,22 @@ def test_provision_creates_identity():
     assert oct(key_stat.st_mode)[-3:] == "600"
 
 
-def test_identity_reload():
+def test_provision_keeps_other_files(tmp_path):
+    # Provisioning into a directory that already holds other data
+    (tmp_path / "missions.db").write_bytes(b"data")
+    identity = DroneIdentity(identity_dir=str(tmp_path))
+    first = identity.provision()
+    second = DroneIdentity(identity_dir=str(tmp_path)).provision()
+
+    assert (tmp_path / "missions.db").read_bytes() == b"data"
+    assert not list(tmp_path.glob("*.tmp"))
+    reloaded = DroneIdentity(identity_dir=str(tmp_path))
+    assert reloaded.drone_id == second["drone_id"] != first["drone_id"]
+
+
+def test_identity_reload(tmp_path):
     """Identity should persist across restarts."""
-    tmp_dir = tempfile.mkdtemp(prefix="test_identity_")
+    tmp_dir = str(tmp_path / "identity")
     identity1 = DroneIdentity(identity_dir=tmp_dir)
     result = identity1.provision(org_id="test-org")
     drone_id = result["drone_id"]
@@ -46,8 +63,8 @@ def test_identity_reload():
     assert identity2.drone_id == drone_id
 
 
-def test_sign_and_verify():
-    tmp_dir = tempfile.mkdtemp(prefix="test_identity_")
+def test_sign_and_verify(tmp_path):
+    tmp_dir = str(tmp_path / "identity")
     identity = DroneIdentity(identity_dir=tmp_dir)
     identity.provision()
 
@@ -58,9 +75,12 @@ def test_sign_and_verify():
     # Tampered data should fail
     assert not identity.verify(b"tampered message", signature)
 
+    # Ed25519 is deterministic: libsodium and OpenSSL backends must agree
+    assert signature == identity._private_key.sign(data)
 
-def test_crypto_engine_sign_verify():
-    tmp_dir = tempfile.mkdtemp(prefix="test_identity_")
+
+def test_crypto_engine_sign_verify(tmp_path):
+    tmp_dir = str(tmp_path / "identity")
     identity = DroneIdentity(identity_dir=tmp_dir)
     identity.provision()
     crypto = CryptoEngine(identity)
@@ -71,9 +91,14 @@ def test_crypto_engine_sign_verify():
     assert crypto.verify_signature(data, sig_b64)
     assert not crypto.verify_signature(b"wrong data", sig_b64)
 
+    raw_sig = crypto.sign_data_raw(data)
+    assert len(raw_sig) == 64
+    assert crypto.verify_signature_raw(data, raw_sig)
+    assert not crypto.verify_signature_raw(b"wrong data", raw_sig)
+
 
-def test_operator_verification():
-    tmp_dir = tempfile.mkdtemp(prefix="test_identity_")
+def test_operator_verification(tmp_path):
+    tmp_dir = str(tmp_path / "identity")
     identity = DroneIdentity(identity_dir=tmp_dir)
     result = identity.provision()
 
@@ -85,6 +110,32 @@ def test_operator_verification():
     assert not identity.verify_operator("wrong-id", api_key)
 
 
+def test_verify_command(tmp_path):
+    tmp_dir = str(tmp_path / "identity")
+    identity = DroneIdentity(identity_dir=tmp_dir)
+    result = identity.provision()
+    crypto = CryptoEngine(identity)
+    operator_id = result["operator_id"]
+    api_key = result["operator_api_key"]
+
+    payload = {"timestamp": utc_now_iso(), "command": "rtl", "params": {"alt": 30}}
+    # Ground stations HMAC the key-sorted json.dumps encoding
+    mac = hmac.new(
+        api_key.encode(), json.dumps(payload, sort_keys=True).encode(), hashlib.sha256
+    ).hexdigest()
+    assert CryptoEngine.command_hmac(payload, api_key) == mac
+
+    assert crypto.verify_command(payload, operator_id, api_key, mac) == (True, "ok")
+    assert crypto.verify_command(payload, operator_id, "wrong-key", mac)[1] == "invalid_operator"
+    tampered = {**payload, "command": "land"}
+    assert crypto.verify_command(tampered, operator_id, api_key, mac)[1] == "invalid_hmac"
+    stale = {**payload, "timestamp": "2020-01-01T00:00:00+00:00"}
+    assert crypto.verify_command(stale, operator_id, api_key, mac)[1].startswith("command_expired")
+    for bad in ("", "yesterday", None, "2026-13-45T99:99:99+00:00"):
+        malformed = {**payload, "timestamp": bad}
+        assert crypto.verify_command(malformed, operator_id, api_key, mac)[1] == "invalid_timestamp"
+
+
 def test_encrypt_decrypt():
     plaintext = b"sensitive mission data that must be encrypted"
     ciphertext, key = CryptoEngine.encrypt_data(plaintext)
@@ -94,9 +145,20 @@ def test_encrypt_decrypt():
     assert decrypted == plaintext
 
 
-def test_finding_signature_flow():
+def test_hash_file(tmp_path):
+    tmp_dir = str(tmp_path)
+    # Empty, small (chunked read) and large (memory-mapped) files
+    for size in (0, 1000, 3 * 1024 * 1024 + 7):
+        data = os.urandom(size)
+        path = os.path.join(tmp_dir, f"f{size}.bin")
+        with open(path, "wb") as f:
+            f.write(data)
+        assert CryptoEngine.hash_file(path) == hashlib.sha256(data).hexdigest()
+
+
+def test_finding_signature_flow(tmp_path):
     """End-to-end: create finding, sign it, verify it."""
-    tmp_dir = tempfile.mkdtemp(prefix="test_identity_")
+    tmp_dir = str(tmp_path / "identity")
     identity = DroneIdentity(identity_dir=tmp_dir)
     identity.provision()
     crypto = CryptoEngine(identity)
@@ -121,3 +183,66 @@ def test_finding_signature_flow():
     # Tamper with finding
     finding.confidence = 0.50
     assert not crypto.verify_signature(finding.signable_payload(), sig)
+
+
+def test_batch_signature_flow(tmp_path):
+    """Batch-signed findings verify individually; tampering is detected."""
+    tmp_dir = str(tmp_path / "identity")
+    identity = DroneIdentity(identity_dir=tmp_dir)
+    identity.provision()
+    crypto = CryptoEngine(identity)
+
+    for n in (1, 2, 3, 5, 8):
+        payloads = [f"finding-{i}".encode() for i in range(n)]
+        sigs = crypto.sign_batch(payloads)
+        assert len(sigs) == n
+        for payload, sig in zip(payloads, sigs):
+            assert crypto.verify_signature(payload, sig)
+        # Signature for one finding must not verify another
+        if n > 1:
+            assert not crypto.verify_signature(payloads[0], sigs[1])
+        assert not crypto.verify_signature(b"tampered", sigs[0])
+
+        items = list(zip(payloads, sigs)) + [(b"tampered", sigs[0])]
+        assert crypto.verify_signatures_batch(items) == [True] * n + [False]
+
+
+def test_audit_batch_chain(tmp_path):
+    """Entries logged in a batch are written once and still chain."""
+    tmp_dir = str(tmp_path / "identity")
+    identity = DroneIdentity(identity_dir=tmp_dir)
+    identity.provision()
+    store = DataStore(db_path=os.path.join(tmp_dir, "audit.db"))
+    audit = AuditLogger(store, CryptoEngine(identity), identity.drone_id)
+
+    audit.log("boot")
+    with audit.batch():
+        for i in range(3):
+            audit.log("detection", {"i": i})
+        # Nothing written until the block exits
+        assert len(store.get_audit_log(limit=10)) == 1
+    audit.log("mission_complete")
+
+    assert store.verify_audit_chain() == (True, 5)
+    store.close()
+
+
+def test_audit_signature_verification(tmp_path):
+    tmp_dir = str(tmp_path / "identity")
+    identity = DroneIdentity(identity_dir=tmp_dir)
+    identity.provision()
+    store = DataStore(db_path=os.path.join(tmp_dir, "audit.db"))
+    audit = AuditLogger(store, CryptoEngine(identity), identity.drone_id)
+
+    for i in range(10):
+        audit.log("detection", {"i": i})
+    assert audit.verify_signatures(workers=2, chunk_size=3) == (True, 10)
+
+    # A forged signature is reported at its position in the log
+    store._conn.execute(
+        "UPDATE audit_log SET signature = ? WHERE details = ?",
+        (audit.log("probe").signature, '{"i": 7}'),
+    )
+    store._conn.commit()
+    assert audit.verify_signatures(workers=2, chunk_size=3) == (False, 7)
+    store.close()
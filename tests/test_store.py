@@ -1,7 +1,8 @@
 """Tests for SQLite data store."""
 
+import sqlite3
 import sys
-import tempfile
+import threading
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -10,13 +11,13 @@ from core.data.models import Mission, MissionStatus, Finding, AuditEntry
 from core.data.store import DataStore
 
 
-def _temp_store() -> DataStore:
-    tmp_db = tempfile.mktemp(suffix=".db", prefix="test_store_")
+def _temp_store(tmp_path) -> DataStore:
+    tmp_db = str(tmp_path / "store.db")
     return DataStore(db_path=tmp_db)
 
 
-def test_save_and_get_mission():
-    store = _temp_store()
+def test_save_and_get_mission(tmp_path):
+    store = _temp_store(tmp_path)
     mission = Mission(
         created_by="test-op",
         waypoints=[{"lat": 25.0, "lon": 121.5}],
@@ -32,8 +33,63 @@ def test_save_and_get_mission():
     store.close()
 
 
-def test_update_mission_status():
-    store = _temp_store()
+def test_reopen_existing_store(tmp_path):
+    tmp_db = str(tmp_path / "store.db")
+    store = DataStore(db_path=tmp_db)
+    mission = Mission(created_by="test")
+    store.save_mission(mission)
+    store.close()
+
+    # Schema is already in place — reopening must not lose data
+    store = DataStore(db_path=tmp_db)
+    assert store.get_mission(mission.id) is not None
+    store.save_finding(Finding(mission_id=mission.id, detection_class="car"))
+    assert store.get_finding_count(mission.id) == 1
+    store.close()
+
+
+def test_store_shared_across_threads(tmp_path):
+    store = _temp_store(tmp_path)
+    mission = Mission(created_by="test")
+    store.save_mission(mission)
+
+    def writer():
+        for _ in range(20):
+            store.save_finding(Finding(mission_id=mission.id, detection_class="car"))
+
+    threads = [threading.Thread(target=writer) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # Reads on this thread see every commit made on the others
+    assert store.get_finding_count(mission.id) == 60
+    store.close()
+
+
+def test_reader_closed_when_thread_exits(tmp_path):
+    store = _temp_store(tmp_path)
+    conns = []
+
+    t = threading.Thread(target=lambda: conns.append(store._reader()))
+    t.start()
+    t.join()
+
+    # The finished thread's connection is closed and no longer tracked
+    assert len(store._readers) == 0
+    try:
+        conns[0].execute("SELECT 1")
+        raise AssertionError("reader connection still open")
+    except sqlite3.ProgrammingError:
+        pass
+    store.list_missions()
+    assert len(store._readers) == 1
+    store.close()
+
+
+def test_update_mission_status(tmp_path):
+    store = _temp_store(tmp_path)
     mission = Mission(created_by="test")
     store.save_mission(mission)
 
@@ -47,8 +103,8 @@ def test_update_mission_status():
     store.close()
 
 
-def test_list_missions():
-    store = _temp_store()
+def test_list_missions(tmp_path):
+    store = _temp_store(tmp_path)
     for i in range(5):
         m = Mission(created_by=f"op-{i}")
         if i >= 3:
@@ -66,8 +122,8 @@ def test_list_missions():
     store.close()
 
 
-def test_save_and_get_findings():
-    store = _temp_store()
+def test_save_and_get_findings(tmp_path):
+    store = _temp_store(tmp_path)
     mission = Mission(created_by="test")
     store.save_mission(mission)
 
@@ -86,11 +142,23 @@ def test_save_and_get_findings():
     findings = store.get_findings(mission.id)
     assert len(findings) == 3
     assert store.get_finding_count(mission.id) == 3
+
+    store.save_findings_batch([
+        Finding(mission_id=mission.id, detection_class="car") for _ in range(2)
+    ])
+    assert store.get_finding_count(mission.id) == 5
+
+    # Any iterable works, including a generator; an empty one is a no-op
+    store.save_findings_batch(
+        Finding(mission_id=mission.id, detection_class="truck") for _ in range(3)
+    )
+    store.save_findings_batch([])
+    assert store.get_finding_count(mission.id) == 8
     store.close()
 
 
-def test_audit_log_chain():
-    store = _temp_store()
+def test_audit_log_chain(tmp_path):
+    store = _temp_store(tmp_path)
 
     # First entry — prev_hash is empty (genesis)
     e1 = AuditEntry(
@@ -123,11 +191,37 @@ def test_audit_log_chain():
     # Get log
     entries = store.get_audit_log(limit=10)
     assert len(entries) == 2
+
+    # Iterator yields the most recent entries oldest first
+    assert [e.action for e in store.iter_audit_log(limit=10)] == ["boot", "mission_start"]
+    assert [e.action for e in store.iter_audit_log(limit=1)] == ["mission_start"]
+    assert [e.action for e in store.iter_audit_log(limit=None)] == ["boot", "mission_start"]
+    store.close()
+
+
+def test_last_audit_hash_sees_other_connections(tmp_path):
+    tmp_db = str(tmp_path / "store.db")
+    store = DataStore(db_path=tmp_db)
+    other = DataStore(db_path=tmp_db)
+
+    e1 = AuditEntry(actor="drone-1", action="boot", prev_hash="", signature="sig1")
+    store.append_audit(e1)
+    assert store.get_last_audit_hash() == e1.content_hash()
+
+    # An append through another connection invalidates the cached hash
+    e2 = AuditEntry(
+        actor="cli", action="mission_create",
+        prev_hash=other.get_last_audit_hash(), signature="sig2",
+    )
+    other.append_audit(e2)
+    assert store.get_last_audit_hash() == e2.content_hash()
+    assert store.verify_audit_chain() == (True, 2)
+    other.close()
     store.close()
 
 
-def test_audit_chain_detects_tampering():
-    store = _temp_store()
+def test_audit_chain_detects_tampering(tmp_path):
+    store = _temp_store(tmp_path)
 
     e1 = AuditEntry(
         actor="drone-1", action="boot", prev_hash="", signature="sig1"
@@ -151,3 +245,33 @@ def test_audit_chain_detects_tampering():
     assert not valid
     assert count == 1  # breaks at the second entry
     store.close()
+
+
+def test_audit_chain_incremental_verify(tmp_path):
+    store = _temp_store(tmp_path)
+
+    def append(action):
+        store.append_audit(AuditEntry(
+            actor="drone-1", action=action,
+            prev_hash=store.get_last_audit_hash(), signature="sig",
+        ))
+
+    for i in range(3):
+        append(f"a{i}")
+    # A plain verify is read-only
+    assert store.verify_audit_chain() == (True, 3)
+    assert store._conn.execute("SELECT COUNT(*) FROM audit_checkpoints").fetchone()[0] == 0
+    assert store.verify_audit_chain(incremental=True) == (True, 3)
+
+    # Only the suffix after the checkpoint is replayed; count is cumulative
+    for i in range(2):
+        append(f"b{i}")
+    assert store.verify_audit_chain(incremental=True) == (True, 5)
+    assert store.verify_audit_chain(incremental=True) == (True, 5)
+
+    # Tampering with the checkpoint anchor is still caught
+    store._conn.execute("UPDATE audit_log SET action = 'tampered' WHERE action = 'b1'")
+    store._conn.commit()
+    valid, _ = store.verify_audit_chain(incremental=True)
+    assert not valid
+    store.close()
@@ -8,6 +8,7 @@ Sets up a simulated environment for testing without real hardware:
 Usage:
     python tools/simulate.py --video test_video.mp4
     python tools/simulate.py --generated   # Use generated test frames
+    python tools/simulate.py --no-detector # Flight only, skip model load
 """
 
 from __future__ import annotations
@@ -52,6 +53,26 @@ DEFAULT_WAYPOINTS = [
 ]
 
 
+def wait_until(fc: FlightController, condition, timeout: float, progress=None) -> bool:
+    """Wait on telemetry updates until condition() holds.
+
+    Re-checks on every telemetry message rather than once a second, so
+    phases end as soon as the vehicle gets there. ``progress`` (if given)
+    is called about once a second while waiting. Returns False on timeout.
+    """
+    deadline = time.monotonic() + timeout
+    next_progress = time.monotonic()
+    while not condition():
+        now = time.monotonic()
+        if now >= deadline:
+            return False
+        if progress is not None and now >= next_progress:
+            progress()
+            next_progress = now + 1.0
+        fc.wait_for_update(min(deadline - now, 0.5))
+    return True
+
+
 def setup_temp_identity() -> DroneIdentity:
     """Create a temporary identity for simulation."""
     tmp_dir = tempfile.mkdtemp(prefix="drone_sim_identity_")
@@ -67,6 +88,7 @@ def run_simulation(
     video_source=0,
     waypoints: list[dict] = None,
     mqtt_broker: str = None,
+    load_detector: bool = True,
 ):
     """Run a simulated patrol mission.
 
@@ -99,10 +121,8 @@ def run_simulation(
 
     logger.info("Connected to SITL")
 
-    # Update telemetry a few times
-    for _ in range(20):
-        fc.update_telemetry()
-        time.sleep(0.1)
+    # Wait for the first mode/GPS/battery reports
+    fc.wait_for_telemetry(timeout=2.0)
 
     telem = fc.telemetry
     logger.info("Position: %.7f, %.7f", telem.lat, telem.lon)
@@ -110,20 +130,23 @@ def run_simulation(
     logger.info("GPS: %dD fix, %d sats", telem.gps_fix, telem.gps_satellites)
     logger.info("Mode: %s | Armed: %s", telem.mode, telem.armed)
 
-    # Setup camera
-    camera = Camera(source=video_source, width=640, height=480, fps=15)
-
-    # Setup detector
-    detector = Detector(
-        model_name="yolov8n",
-        confidence_threshold=0.5,
-        target_classes=["person", "car", "truck"],
-    )
-    logger.info("Loading detection model...")
-    if detector.load():
-        logger.info("Detector ready (backend: %s)", detector.backend)
+    # Setup detector and camera (skipped entirely for flight-only runs)
+    detector = None
+    camera = None
+    if load_detector:
+        detector = Detector(
+            model_name="yolov8n",
+            confidence_threshold=0.5,
+            target_classes=["person", "car", "truck"],
+        )
+        logger.info("Loading detection model...")
+        if detector.load():
+            logger.info("Detector ready (backend: %s)", detector.backend)
+            camera = Camera(source=video_source, width=640, height=480, fps=15)
+        else:
+            logger.warning("Detector not loaded — running flight-only simulation")
     else:
-        logger.warning("Detector not loaded — running flight-only simulation")
+        logger.info("Detector disabled — running flight-only simulation")
 
     # Setup MQTT
     mqtt_client = None
@@ -175,13 +198,15 @@ def run_simulation(
         fc.takeoff(altitude)
 
         # Wait for altitude
-        for _ in range(60):
-            fc.update_telemetry()
-            t = fc.telemetry
-            logger.info("  Alt: %.1fm / %.0fm", t.alt_rel, altitude)
-            if t.alt_rel >= altitude * 0.9:
-                break
-            time.sleep(1)
+        wait_until(
+            fc,
+            lambda: fc.telemetry.alt_rel >= altitude * 0.9,
+            timeout=60,
+            progress=lambda: logger.info(
+                "  Alt: %.1fm / %.0fm", fc.telemetry.alt_rel, altitude
+            ),
+        )
+        logger.info("  Alt: %.1fm / %.0fm", fc.telemetry.alt_rel, altitude)
 
         fc.set_speed(mission.parameters["speed_ms"])
 
@@ -191,21 +216,21 @@ def run_simulation(
             fc.goto(wp["lat"], wp["lon"], wp.get("alt", altitude))
             audit.log("waypoint_navigate", {"index": i, "target": wp})
 
-            # Fly to waypoint
-            for _ in range(120):  # max 2 min per waypoint
-                fc.update_telemetry()
+            # Fly to waypoint (max 2 min per waypoint)
+            def log_position():
                 t = fc.telemetry
-
-                if fc.reached_waypoint(wp["lat"], wp["lon"], tolerance_m=3.0):
-                    logger.info("  Reached waypoint %d", i)
-                    break
-
-                # Log position periodically
                 logger.debug(
                     "  Pos: %.6f, %.6f | Alt: %.1f | Spd: %.1f",
                     t.lat, t.lon, t.alt_rel, t.groundspeed,
                 )
-                time.sleep(1)
+
+            if wait_until(
+                fc,
+                lambda: fc.reached_waypoint(wp["lat"], wp["lon"], tolerance_m=3.0),
+                timeout=120,
+                progress=log_position,
+            ):
+                logger.info("  Reached waypoint %d", i)
 
             # Hover briefly at waypoint
             logger.info("  Hovering at waypoint %d...", i)
@@ -217,11 +242,7 @@ def run_simulation(
         audit.log("simulation_complete", {"mission_id": mission.id})
 
         # Wait for landing
-        for _ in range(60):
-            fc.update_telemetry()
-            if fc.telemetry.alt_rel < 0.5:
-                break
-            time.sleep(1)
+        wait_until(fc, lambda: fc.telemetry.alt_rel < 0.5, timeout=60)
 
         logger.info("Landed.")
 
@@ -240,8 +261,7 @@ def run_simulation(
     valid, count = store.verify_audit_chain()
     logger.info("Audit entries: %d (chain valid: %s)", count, valid)
 
-    entries = store.get_audit_log(limit=100)
-    for entry in reversed(entries):
+    for entry in store.iter_audit_log(limit=100):
         logger.info("  [%s] %s", entry.action, json.dumps(entry.details))
 
     store.close()
@@ -270,6 +290,11 @@ def main():
         default=None,
         help="MQTT broker address (default: none)",
     )
+    parser.add_argument(
+        "--no-detector",
+        action="store_true",
+        help="Skip loading the detection model (flight-only simulation)",
+    )
     args = parser.parse_args()
 
     video_source = args.video if args.video else 0
@@ -284,6 +309,7 @@ def main():
         video_source=video_source,
         waypoints=waypoints,
         mqtt_broker=args.mqtt,
+        load_detector=not args.no_detector,
     )
 
 